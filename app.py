@@ -3,31 +3,31 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+import matplotlib
+matplotlib.use('Agg')  # headless rendering; no GUI event loop in a server process
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
 import json
-
-# Page configuration
-st.set_page_config(
-    page_title="Data Visualization Dashboard",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Initialize session state for theme and filters
-if 'dark_mode' not in st.session_state:
-    st.session_state.dark_mode = False
-if 'filters' not in st.session_state:
-    st.session_state.filters = {
-        'min_value': None,
-        'max_value': None,
-        'categories': [],
-        'date_range': None
-    }
-if 'comparison_mode' not in st.session_state:
-    st.session_state.comparison_mode = False
+import io
+import base64
+import hashlib
+import sys
+import inspect
+import functools
+import threading
+import weakref
+import os
+import time
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from statistics import NormalDist
 
 # Dynamic CSS based on theme
 def get_theme_css(dark_mode=False):
@@ -256,97 +256,1207 @@ def get_theme_css(dark_mode=False):
         </style>
         """
 
-# Apply theme (only if in Streamlit runtime)
-try:
+
+def init_session_state():
+    """Default theme, filters and data seed for a new session"""
+    if 'dark_mode' not in st.session_state:
+        st.session_state.dark_mode = False
+    if 'filters' not in st.session_state:
+        st.session_state.filters = {
+            'min_value': None,
+            'max_value': None,
+            'categories': [],
+            'date_range': None
+        }
+    if 'comparison_mode' not in st.session_state:
+        st.session_state.comparison_mode = False
+    if 'data_seed' not in st.session_state:
+        st.session_state.data_seed = int(np.random.SeedSequence().entropy % (2**32))
+
+
+def setup_page():
+    """Page configuration, session defaults and theme CSS, run at the top of every rerun.
+
+    Kept out of module scope so that importing app (tests, process pool
+    workers) has no UI side effects.
+    """
+    st.set_page_config(
+        page_title="Data Visualization Dashboard",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    init_session_state()
     st.markdown(get_theme_css(st.session_state.dark_mode), unsafe_allow_html=True)
-except (AttributeError, KeyError):
-    # Handle case when running tests or outside Streamlit runtime
-    st.markdown(get_theme_css(False), unsafe_allow_html=True)
 
 
-def generate_sine_data(frequency=1, amplitude=1, phase=0, points=1000):
+# Dataset cache settings
+DATASET_CACHE_MAX_ENTRIES = 64
+DATASET_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+FILTER_CACHE_MAX_ENTRIES = 32
+FILTER_CACHE_MAX_BYTES = 128 * 1024 * 1024  # 128 MB
+CATEGORY_INDEX_MAX_ENTRIES = 32
+CATEGORY_INDEX_MAX_BYTES = 128 * 1024 * 1024  # 128 MB
+FIGURE_CACHE_MAX_ENTRIES = 64
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+STATIC_RENDER_MAX_ENTRIES = 32
+STATIC_RENDER_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+SAMPLE_BUFFER_MAX_ENTRIES = 16
+SAMPLE_BUFFER_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+
+def _view_overhead(column, seen):
+    """Bytes a column view keeps alive beyond its own length.
+
+    A prefix view pins its whole base array (e.g. a SampleBuffer column at
+    full capacity, or one it has since outgrown), so the base is counted
+    once per frame in place of the view.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.cat.codes
+    values = column.to_numpy()
+    root = values
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if root is values:
+        return 0
+    extra = 0 if id(root) in seen else root.nbytes
+    seen.add(id(root))
+    return extra - values.nbytes
+
+
+def estimate_nbytes(obj):
+    """Estimate the in-memory size of a cached object in bytes"""
+    if isinstance(obj, pd.DataFrame):
+        seen = set()
+        return int(obj.memory_usage(index=True, deep=True).sum()) + sum(
+            _view_overhead(column, seen) for _, column in obj.items())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in obj)
+    if isinstance(obj, dict):
+        return sum(estimate_nbytes(item) for item in obj.values())
+    return sys.getsizeof(obj)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and an optional byte budget"""
+
+    def __init__(self, max_entries=128, max_bytes=None, sizeof=estimate_nbytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Return the cached value for key and mark it as most recently used"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """Store value under key, evicting least recently used entries as needed"""
+        nbytes = self._sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            # Values larger than the whole budget are returned but never stored
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                return value
+            self._entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_bytes
+        return value
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key satisfies predicate; return the number dropped"""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                self.total_bytes -= self._entries.pop(key)[1]
+        return len(stale)
+
+    def clear(self):
+        """Remove all entries and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return a summary of cache usage"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+@st.cache_resource
+def get_dataset_cache():
+    """Process-wide dataset cache that survives Streamlit reruns"""
+    return LRUCache(max_entries=DATASET_CACHE_MAX_ENTRIES,
+                    max_bytes=DATASET_CACHE_MAX_BYTES)
+
+
+@st.cache_resource
+def get_fingerprint_registry():
+    """Fingerprints of generated frames by object id, dropped when the frame is freed"""
+    return {}
+
+
+def register_fingerprint(df, fingerprint):
+    """Attach an exact fingerprint to a generated frame"""
+    registry = get_fingerprint_registry()
+    frame_id = id(df)
+    if frame_id not in registry or registry[frame_id][0]() is not df:
+        registry[frame_id] = (weakref.ref(df), fingerprint)
+        weakref.finalize(df, registry.pop, frame_id, None)
+    return df
+
+
+def is_registered(df):
+    """Whether df came from a cached generator and has an exact fingerprint"""
+    entry = get_fingerprint_registry().get(id(df))
+    return entry is not None and entry[0]() is df
+
+
+def dataset_fingerprint(df):
+    """Identity of a dataset for keying derived results, or None.
+
+    Frames from cached generators, and the filtered, sliced and streamed
+    frames derived from them, carry an exact registered key. Any other frame
+    returns None: callers compute its results without caching rather than
+    hash every row on each rerun or risk a sampled hash colliding.
+    """
+    entry = get_fingerprint_registry().get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return None
+
+
+def day_anchor():
+    """Stable timestamp anchor: midnight of the current day"""
+    return pd.Timestamp.now().normalize()
+
+
+def minute_anchor():
+    """Stable timestamp anchor: start of the current minute"""
+    return pd.Timestamp.now().floor('min')
+
+
+def _freeze(value):
+    """Make list and array arguments hashable for use in a cache key"""
+    if isinstance(value, np.ndarray):
+        return _freeze(value.tolist())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def cached_dataset(anchors=None, seeded=True):
+    """Memoize a generate_* function on its parameters plus an explicit seed.
+
+    ``anchors`` maps timestamp parameters to functions that resolve a ``None``
+    value to a stable boundary, so the wall clock does not change the key.
+    Seeded generators called with ``seed=None`` bypass the cache and stay fully
+    random. Cached frames are shared between callers and must not be mutated.
+    """
+    anchors = anchors or {}
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            for name, resolve in anchors.items():
+                if bound.arguments[name] is None:
+                    bound.arguments[name] = resolve()
+
+            if seeded and bound.arguments.get('seed') is None:
+                return func(*bound.args, **bound.kwargs)
+
+            key = (func.__name__,) + tuple(
+                (name, _freeze(value)) for name, value in bound.arguments.items())
+            cache = get_dataset_cache()
+            result = cache.get(key)
+            if result is None:
+                result = cache.put(key, func(*bound.args, **bound.kwargs))
+                if isinstance(result, pd.DataFrame):
+                    register_fingerprint(result, key)
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def get_data_seed():
+    """Get the dataset seed for the current session"""
+    return st.session_state.data_seed
+
+
+def _smallest_int_dtype(column):
+    """Smallest signed integer dtype that holds every value of column"""
+    if len(column) == 0:
+        return column.dtype
+    low, high = column.min(), column.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return column.dtype
+
+
+def compact_dtypes(df, categories=None):
+    """Return a lean copy of df: categorical labels and narrow numeric dtypes.
+
+    Label (object/string) columns become pandas Categoricals; ``categories``
+    optionally fixes the category set per column so separately generated
+    chunks stay concatenable. Floats become float32 and integers the smallest
+    signed integer type that holds their range.
+    """
+    categories = categories or {}
+    dtypes = {}
+    for name, column in df.items():
+        if pd.api.types.is_float_dtype(column.dtype):
+            finite = column[np.isfinite(column)]
+            if finite.empty or finite.abs().max() <= np.finfo(np.float32).max:
+                dtypes[name] = np.float32
+        elif pd.api.types.is_integer_dtype(column.dtype):
+            dtypes[name] = _smallest_int_dtype(column)
+        elif pd.api.types.is_object_dtype(column.dtype) or pd.api.types.is_string_dtype(column.dtype):
+            dtypes[name] = pd.CategoricalDtype(categories.get(name))
+    return df.astype(dtypes)
+
+
+def memory_report(df, lean_df=None):
+    """Bytes per column before and after compact_dtypes"""
+    lean_df = compact_dtypes(df) if lean_df is None else lean_df
+    before = df.memory_usage(index=False, deep=True)
+    after = lean_df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'lean dtype': lean_df.dtypes.astype(str),
+        'bytes': before,
+        'lean bytes': after,
+    })
+    report.loc['total'] = ['', '', before.sum(), after.sum()]
+    report['saving %'] = (100 * (1 - report['lean bytes'] / report['bytes'].clip(lower=1))).round(1)
+    return report
+
+
+def wave_matrix(x, frequencies, amplitudes, phases):
+    """Evaluate K sine waves over a shared x grid in one broadcast; returns (K, len(x))"""
+    frequencies = np.asarray(frequencies, dtype=np.float64)[:, np.newaxis]
+    amplitudes = np.asarray(amplitudes, dtype=np.float64)[:, np.newaxis]
+    phases = np.asarray(phases, dtype=np.float64)[:, np.newaxis]
+    return amplitudes * np.sin(frequencies * x[np.newaxis, :] + phases)
+
+
+@cached_dataset(seeded=False)
+def generate_sine_data(frequency=1, amplitude=1, phase=0, points=1000, lean=False):
     """Generate sine wave data"""
     x = np.linspace(0, 4 * np.pi, points)
-    y = amplitude * np.sin(frequency * x + phase)
-    return pd.DataFrame({'x': x, 'y': y})
+    y = wave_matrix(x, [frequency], [amplitude], [phase])[0]
+    df = pd.DataFrame({'x': x, 'y': y})
+    return compact_dtypes(df) if lean else df
 
 
-def generate_timeseries_data(days=365):
-    """Generate time series data with trend and seasonality"""
-    dates = pd.date_range(start=datetime.now() - timedelta(days=days), 
-                          end=datetime.now(), freq='D')
-    
-    trend = np.linspace(100, 200, len(dates))
-    seasonal = 20 * np.sin(np.linspace(0, 4 * np.pi, len(dates)))
-    noise = np.random.normal(0, 10, len(dates))
-    values = trend + seasonal + noise
+@cached_dataset(seeded=False)
+def generate_wave_data(waves, points=1000, superpose=False, labels=None, lean=False):
+    """Generate several sine waves from (frequency, amplitude, phase) triples.
+
+    All waves are evaluated in one broadcast over a shared x grid. Returns a
+    long-form frame with a categorical 'wave' column, or a single x/y frame
+    holding their sum when ``superpose`` is True.
+    """
+    frequencies, amplitudes, phases = np.asarray(waves, dtype=np.float64).reshape(-1, 3).T
+    x = np.linspace(0, 4 * np.pi, points)
+    y = wave_matrix(x, frequencies, amplitudes, phases)
+    
+    if superpose:
+        df = pd.DataFrame({'x': x, 'y': y.sum(axis=0)})
+        return compact_dtypes(df) if lean else df
+    
+    if labels is None:
+        labels = [f'Wave {i+1} (f={f:g}, A={a:g})'
+                  for i, (f, a) in enumerate(zip(frequencies, amplitudes))]
+    df = pd.DataFrame({
+        'x': np.tile(x, len(frequencies)),
+        'y': y.ravel(),
+        'wave': pd.Categorical.from_codes(np.repeat(np.arange(len(frequencies)), points),
+                                          categories=labels)
+    })
+    return compact_dtypes(df) if lean else df
+
+
+def square_wave_harmonics(n_waves):
+    """(frequency, amplitude, phase) triples of the first n odd Fourier harmonics of a square wave"""
+    frequencies = 2 * np.arange(n_waves) + 1
+    amplitudes = 4 / (np.pi * frequencies)
+    return np.column_stack([frequencies, amplitudes, np.zeros(n_waves)])
+
+
+@cached_dataset(seeded=False)
+def generate_wave_surface(resolution=50, extent=5):
+    """Radial sine surface z = sin(sqrt(x^2 + y^2)) on a resolution x resolution grid.
+
+    Returns (x, y, z) with 1-D axes; z is built by broadcasting instead of meshgrid.
+    """
+    x = np.linspace(-extent, extent, resolution)
+    y = np.linspace(-extent, extent, resolution)
+    z = np.sin(np.sqrt(x[np.newaxis, :] ** 2 + y[:, np.newaxis] ** 2))
+    return x, y, z
+
+
+# Time series model shared by the in-memory and streaming generators
+TIMESERIES_CATEGORIES = np.array(['A', 'B', 'C'])
+TIMESERIES_CHUNK_SIZE = 100_000
+
+
+def _timeseries_step(freq):
+    """Convert a fixed pandas frequency string ('D', 'h', 'min', 's') to a Timedelta"""
+    try:
+        return pd.Timedelta(pd.tseries.frequencies.to_offset(freq))
+    except ValueError:
+        raise ValueError(f"Streaming time series need a fixed frequency, got {freq!r}")
+
+
+def _timeseries_rngs(seed):
+    """Independent noise and category streams so chunking never changes the draws"""
+    noise_seq, category_seq = np.random.SeedSequence(seed).spawn(2)
+    return np.random.default_rng(noise_seq), np.random.default_rng(category_seq)
+
+
+def _timeseries_block(positions, periods, noise_rng, category_rng):
+    """Trend, seasonality and noise for the given global row positions"""
+    progress = positions / max(periods - 1, 1)
+    trend = 100 + 100 * progress
+    seasonal = 20 * np.sin(4 * np.pi * progress)
+    noise = noise_rng.normal(0, 10, len(positions))
+    categories = TIMESERIES_CATEGORIES[
+        (category_rng.random(len(positions)) * len(TIMESERIES_CATEGORIES)).astype(np.intp)
+    ]
+    return trend + seasonal + noise, categories
+
+
+def iter_timeseries_chunks(periods, freq='D', chunk_size=TIMESERIES_CHUNK_SIZE,
+                           seed=None, end=None, as_frame=True, lean=False):
+    """Yield a long time series in fixed-size chunks with bounded memory.
+
+    Trend and seasonality are evaluated from each row's global position and the
+    noise/category generators carry their state from chunk to chunk, so the
+    concatenated chunks form one continuous series whatever the chunk size.
+    Yields DataFrames, or dicts of NumPy arrays when ``as_frame`` is False;
+    ``lean`` yields float32 values and categorical labels.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    step = _timeseries_step(freq)
+    end = day_anchor() if end is None else pd.Timestamp(end)
+    start = end - step * (periods - 1)
+    noise_rng, category_rng = _timeseries_rngs(seed)
+    
+    for offset in range(0, periods, chunk_size):
+        positions = np.arange(offset, min(offset + chunk_size, periods))
+        dates = start.value + step.value * positions
+        values, categories = _timeseries_block(positions, periods, noise_rng, category_rng)
+        if lean:
+            values = values.astype(np.float32)
+        if as_frame:
+            chunk = pd.DataFrame({
+                'date': pd.to_datetime(dates),
+                'value': values,
+                'category': categories
+            })
+            if lean:
+                chunk = compact_dtypes(chunk, {'category': TIMESERIES_CATEGORIES})
+            yield mark_time_sorted(chunk, 'date')
+        else:
+            yield {
+                'date': dates.astype('datetime64[ns]'),
+                'value': values,
+                'category': categories
+            }
+
+
+def write_timeseries_csv(buffer, periods, freq='min', chunk_size=TIMESERIES_CHUNK_SIZE,
+                         seed=None, end=None):
+    """Stream a long time series to a text buffer as CSV; return rows written"""
+    rows = 0
+    for chunk in iter_timeseries_chunks(periods, freq=freq, chunk_size=chunk_size,
+                                        seed=seed, end=end):
+        chunk.to_csv(buffer, index=False, header=(rows == 0))
+        rows += len(chunk)
+    return rows
+
+
+@cached_dataset(anchors={'end': day_anchor})
+def generate_timeseries_data(days=365, seed=None, end=None, lean=False, samples_per_day=1):
+    """Generate time series data with trend and seasonality.
+
+    ``samples_per_day`` above 1 samples the same span of days more finely
+    (steps are rounded to whole nanoseconds), so larger datasets stay within
+    the Timestamp range.
+    """
+    periods = days * samples_per_day + 1
+    freq = 'D' if samples_per_day == 1 else pd.Timedelta(days=1) / samples_per_day
+    return next(iter_timeseries_chunks(periods, freq=freq, chunk_size=periods,
+                                       seed=seed, end=end, lean=lean))
+
+
+@cached_dataset(anchors={'end': day_anchor})
+def generate_multi_series_data(n_series=100, periods=365, freq='D', seed=None, end=None,
+                               random_walk=False, layout='long', lean=False):
+    """Generate many independent series in one vectorized (series x time) pass.
+
+    Each series gets its own base level, trend, seasonal amplitude and phase,
+    broadcast against a shared time axis; noise for all series is drawn from a
+    single Generator. ``random_walk`` accumulates the noise like the realtime
+    sensor data. ``layout`` selects a long-form frame ('long'), one column per
+    series ('wide') or the raw 2-D array ('array'); ``lean`` stores float32.
+    """
+    if layout not in ('long', 'wide', 'array'):
+        raise ValueError(f"Unknown layout {layout!r}")
+    rng = np.random.default_rng(seed)
+    step = _timeseries_step(freq)
+    end = day_anchor() if end is None else pd.Timestamp(end)
+    
+    # Per-series parameters as (n_series, 1) columns for broadcasting
+    base = rng.uniform(50, 150, (n_series, 1))
+    rise = rng.normal(100, 25, (n_series, 1))
+    amplitude = rng.uniform(5, 30, (n_series, 1))
+    phase = rng.uniform(0, 2 * np.pi, (n_series, 1))
+    
+    progress = np.arange(periods) / max(periods - 1, 1)
+    noise = rng.normal(0, 10, (n_series, periods))
+    if random_walk:
+        noise = np.cumsum(noise, axis=1)
+    values = base + rise * progress + amplitude * np.sin(4 * np.pi * progress + phase) + noise
+    if lean:
+        values = values.astype(np.float32)
+    
+    if layout == 'array':
+        return values
+    
+    dates = pd.date_range(end=end, periods=periods, freq=step)
+    labels = np.char.add('Series ', np.arange(1, n_series + 1).astype(str))
+    if layout == 'wide':
+        return pd.DataFrame(values.T, index=pd.Index(dates, name='date'), columns=labels)
     
     return pd.DataFrame({
-        'date': dates,
-        'value': values,
-        'category': np.random.choice(['A', 'B', 'C'], len(dates))
+        'date': np.tile(dates.values, n_series),
+        'series': pd.Categorical.from_codes(np.repeat(np.arange(n_series), periods),
+                                            categories=labels),
+        'value': values.ravel()
     })
 
 
-def generate_scatter_data(n_points=500):
-    """Generate correlated scatter data"""
-    x = np.random.randn(n_points)
-    y = 2 * x + np.random.randn(n_points) * 0.5
-    colors = np.random.choice(['Group 1', 'Group 2', 'Group 3'], n_points)
-    sizes = np.random.randint(10, 100, n_points)
+class SampleBuffer:
+    """Prefix-stable sample columns that grow on demand.
+
+    ``block(rngs, size)`` draws ``size`` more rows as a dict of arrays. Each
+    column reads from its own generator in ``rngs``, so the first n rows do not
+    depend on how the draws were split: growing to n draws only the missing
+    rows into arrays whose capacity doubles, and shrinking is a prefix view.
+    """
+
+    def __init__(self, block, n_streams, seed=None):
+        self._block = block
+        self._rngs = [np.random.default_rng(child)
+                      for child in np.random.SeedSequence(seed).spawn(n_streams)]
+        self._columns = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.length = 0
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns.values())
+
+    def extend_to(self, n):
+        """Make sure at least n rows are drawn, drawing only the missing ones"""
+        with self._lock:
+            if n <= self.length:
+                return self
+            delta = self._block(self._rngs, n - self.length)
+            for name, values in delta.items():
+                column = self._columns.get(name)
+                if column is None:
+                    column = self._columns[name] = values
+                    continue
+                if len(column) < n:
+                    grown = np.empty(max(n, 2 * len(column)), dtype=column.dtype)
+                    grown[:self.length] = column[:self.length]
+                    column = self._columns[name] = grown
+                column[self.length:n] = values
+            self.length = n
+        return self
+
+    def column(self, name, n):
+        """First n values of a column as a zero-copy view"""
+        return self.extend_to(n)._columns[name][:n]
+
+    def frame(self, n, columns=None):
+        """DataFrame over zero-copy views of the first n rows"""
+        self.extend_to(n)
+        names = self._columns if columns is None else columns
+        return pd.DataFrame({name: self._columns[name][:n] for name in names}, copy=False)
+
+    def histogram(self, name, n, bins=50):
+        """np.histogram of the first n values of a column, updated from the delta.
+
+        The last result per (column, bins) is kept with the positions of its
+        extremes. While the extremes, and hence the edges, stay the same the
+        counts of the rows added or dropped since are added or subtracted;
+        otherwise the prefix is binned from scratch. Draws must be finite.
+        """
+        values = self.column(name, n)
+        key = (name, bins)
+        with self._lock:
+            state = self._histograms.get(key)
+        if state is not None and state['n'] == n:
+            return state['counts'], state['edges']
+        
+        counts = None
+        if state is not None and n > state['n']:
+            delta = values[state['n']:]
+            if delta.min() >= state['edges'][0] and delta.max() <= state['edges'][-1]:
+                counts = state['counts'] + np.histogram(delta, state['edges'])[0]
+                low, high = state['low'], state['high']
+        elif state is not None and max(state['low'], state['high']) < n:
+            dropped = self._columns[name][n:state['n']]
+            counts = state['counts'] - np.histogram(dropped, state['edges'])[0]
+            low, high = state['low'], state['high']
+        
+        if counts is None:
+            counts, edges = np.histogram(values, bins=bins)
+            low, high = int(np.argmin(values)), int(np.argmax(values))
+        else:
+            edges = state['edges']
+        with self._lock:
+            self._histograms[key] = {'n': n, 'counts': counts, 'edges': edges,
+                                     'low': low, 'high': high}
+        return counts, edges
+
+
+@st.cache_resource
+def get_sample_buffer_cache():
+    """Process-wide sample buffers by generator and seed, kept across reruns"""
+    return LRUCache(max_entries=SAMPLE_BUFFER_MAX_ENTRIES, max_bytes=SAMPLE_BUFFER_MAX_BYTES)
+
+
+def sample_buffer(name, seed, block, n_streams, n):
+    """SampleBuffer for (name, seed) holding at least n rows.
+
+    Unseeded buffers are fresh every call and never cached. The buffer is
+    stored again after growing so the cache's byte budget sees its new size.
+    """
+    if seed is None:
+        return SampleBuffer(block, n_streams).extend_to(n)
+    cache = get_sample_buffer_cache()
+    buffer = cache.get((name, seed))
+    if buffer is None:
+        buffer = SampleBuffer(block, n_streams, seed)
+    grew = n > buffer.length
+    buffer.extend_to(n)
+    if grew or (name, seed) not in cache:
+        cache.put((name, seed), buffer)
+    return buffer
+
+
+SCATTER_GROUPS = np.array(['Group 1', 'Group 2', 'Group 3'])
+
+
+def _scatter_block(rngs, size):
+    """Correlated x/y, group codes and marker sizes for size more rows.
+
+    Groups and sizes are stored as int8; labels are only built for the rows a
+    non-lean frame asks for.
+    """
+    x_rng, noise_rng, group_rng, size_rng = rngs
+    x = x_rng.standard_normal(size)
+    return {
+        'x': x,
+        'y': 2 * x + noise_rng.standard_normal(size) * 0.5,
+        'codes': group_rng.choice(len(SCATTER_GROUPS), size).astype(np.int8),
+        'size': size_rng.integers(10, 100, size).astype(np.int8),
+    }
+
+
+@cached_dataset()
+def generate_scatter_data(n_points=500, seed=None, lean=False):
+    """Generate correlated scatter data.
+
+    Rows come from a prefix-stable buffer per seed, so a larger n_points only
+    draws the extra rows and a smaller one is a view of the same values.
+    """
+    buffer = sample_buffer('scatter', seed, _scatter_block, 4, n_points)
+    
+    if lean:
+        # Build the categorical from codes directly; millions of label strings are costly
+        return compact_dtypes(pd.DataFrame({
+            'x': buffer.column('x', n_points),
+            'y': buffer.column('y', n_points),
+            'group': pd.Categorical.from_codes(buffer.column('codes', n_points), SCATTER_GROUPS),
+            'size': buffer.column('size', n_points)
+        }))
     
     return pd.DataFrame({
-        'x': x,
-        'y': y,
-        'group': colors,
-        'size': sizes
-    })
+        'x': buffer.column('x', n_points),
+        'y': buffer.column('y', n_points),
+        'group': SCATTER_GROUPS[buffer.column('codes', n_points)],
+        'size': buffer.column('size', n_points).astype(np.int64)
+    }, copy=False)
 
 
-def generate_categorical_data():
+@cached_dataset()
+def generate_categorical_data(seed=None, lean=False):
     """Generate categorical data for bar charts"""
+    rng = np.random.default_rng(seed)
     categories = ['Product A', 'Product B', 'Product C', 'Product D', 'Product E']
-    values = np.random.randint(50, 200, len(categories))
+    values = rng.integers(50, 200, len(categories))
     
-    return pd.DataFrame({
+    df = pd.DataFrame({
         'category': categories,
         'value': values,
-        'subcategory': np.random.choice(['Type 1', 'Type 2'], len(categories))
+        'subcategory': rng.choice(['Type 1', 'Type 2'], len(categories))
     })
+    return compact_dtypes(df, {'category': categories,
+                               'subcategory': ['Type 1', 'Type 2']}) if lean else df
 
 
-def generate_distribution_data(n_samples=1000):
-    """Generate data for distribution plots"""
-    normal_data = np.random.normal(100, 15, n_samples)
-    exponential_data = np.random.exponential(50, n_samples)
-    
+def _distribution_block(rngs, size):
+    """size more normal and exponential samples, one stream per column"""
+    normal_rng, exponential_rng = rngs
+    return {
+        'normal': normal_rng.normal(100, 15, size),
+        'exponential': exponential_rng.exponential(50, size),
+    }
+
+
+def distribution_buffer(seed, n_samples):
+    """Prefix-stable buffer behind generate_distribution_data"""
+    return sample_buffer('distribution', seed, _distribution_block, 2, n_samples)
+
+
+@cached_dataset()
+def generate_distribution_data(n_samples=1000, seed=None, lean=False):
+    """Generate data for distribution plots (prefix views of a growing buffer)"""
+    df = distribution_buffer(seed, n_samples).frame(n_samples)
+    return compact_dtypes(df) if lean else df
+
+
+# Correlation engine settings
+CORRELATION_BLOCK_ROWS = 50_000
+CORRELATION_COLUMN_BLOCK = 64
+CORRELATION_MAX_ROWS = 100_000  # bounds one recompute at 500 variables to a few seconds
+CORRELATION_ROW_OPTIONS = [100, 1_000, 10_000, CORRELATION_MAX_ROWS]
+
+
+def iter_correlated_blocks(n_rows, n_vars, seed=None, n_factors=0,
+                           block_rows=CORRELATION_BLOCK_ROWS):
+    """Yield float32 row blocks of a latent-factor dataset with n_vars columns.
+
+    Each group of CORRELATION_COLUMN_BLOCK columns draws from its own child
+    seed, so column j depends only on the seed and j: a wider dataset always
+    starts with the columns of a narrower one. Rows are drawn sequentially,
+    so the block size never changes the values.
+    """
+    root = np.random.SeedSequence(seed)
+    factor_seq, = root.spawn(1)
+    n_column_blocks = -(-n_vars // CORRELATION_COLUMN_BLOCK)
+    column_streams = []
+    for block_seq in root.spawn(n_column_blocks):
+        loading_seq, noise_seq = block_seq.spawn(2)
+        loadings = np.random.default_rng(loading_seq).uniform(
+            -1, 1, (CORRELATION_COLUMN_BLOCK, n_factors))
+        column_streams.append((loadings, np.random.default_rng(noise_seq)))
+    factor_rng = np.random.default_rng(factor_seq)
+    
+    for offset in range(0, n_rows, block_rows):
+        rows = min(block_rows, n_rows - offset)
+        factors = factor_rng.standard_normal((rows, n_factors))
+        block = np.empty((rows, n_column_blocks * CORRELATION_COLUMN_BLOCK), dtype=np.float32)
+        for i, (loadings, noise_rng) in enumerate(column_streams):
+            columns = slice(i * CORRELATION_COLUMN_BLOCK, (i + 1) * CORRELATION_COLUMN_BLOCK)
+            block[:, columns] = factors @ loadings.T + noise_rng.standard_normal(
+                (rows, CORRELATION_COLUMN_BLOCK))
+        yield block[:, :n_vars]
+
+
+def blocked_correlation(data, block_rows=CORRELATION_BLOCK_ROWS):
+    """Pearson correlation matrix computed in two streaming passes over row blocks.
+
+    ``data`` is a 2-D array/DataFrame or a callable returning a fresh iterable
+    of 2-D row blocks (it is called once per pass). The first pass
+    accumulates column sums in float64; the second centers each block on
+    those means and accumulates X.T @ X in float64, whose diagonal gives the
+    variances, so no moment is taken around zero. Float64 input is centered
+    before it is narrowed to float32. Memory is bounded by one block plus the
+    (n_vars x n_vars) result. Returns float32.
+    """
+    if callable(data):
+        blocks = data
+    else:
+        values = np.asarray(data)
+        
+        def blocks():
+            return (values[i:i + block_rows] for i in range(0, len(values), block_rows))
+    
+    n = 0
+    total = None
+    for block in blocks():
+        block_sum = block.sum(axis=0, dtype=np.float64)
+        total = block_sum if total is None else total + block_sum
+        n += len(block)
+    mean = total / n
+    
+    gram = np.zeros((len(mean), len(mean)), dtype=np.float64)
+    for block in blocks():
+        dtype = np.result_type(block.dtype, np.float32)
+        centered = (block.astype(dtype, copy=False) - mean.astype(dtype)).astype(
+            np.float32, copy=False)
+        gram += centered.T @ centered
+    
+    variance = np.diag(gram).copy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = 1 / np.sqrt(variance)
+        corr = (gram * scale[:, None] * scale[None, :]).astype(np.float32)
+    corr = (corr + corr.T) / 2  # exact symmetry despite float32 rounding
+    np.clip(corr, -1, 1, out=corr)
+    np.fill_diagonal(corr, np.where(variance > 0, 1, np.nan))
+    return corr
+
+
+def streaming_pearson(x, y, block_rows=CORRELATION_BLOCK_ROWS):
+    """Pearson correlation of two columns in one pass over row blocks.
+
+    Per-block means and centered (co-)moments are merged with Chan's
+    pairwise update in float64, so only one block is ever upcast.
+    """
+    n = 0
+    mean_x = mean_y = m2_x = m2_y = co_moment = 0.0
+    for start in range(0, len(x), block_rows):
+        block_x = np.asarray(x[start:start + block_rows], dtype=np.float64)
+        block_y = np.asarray(y[start:start + block_rows], dtype=np.float64)
+        size = len(block_x)
+        block_mean_x, block_mean_y = block_x.mean(), block_y.mean()
+        dx, dy = block_x - block_mean_x, block_y - block_mean_y
+        
+        delta_x, delta_y = block_mean_x - mean_x, block_mean_y - mean_y
+        weight = n * size / (n + size)
+        m2_x += dx @ dx + delta_x ** 2 * weight
+        m2_y += dy @ dy + delta_y ** 2 * weight
+        co_moment += dx @ dy + delta_x * delta_y * weight
+        n += size
+        mean_x += delta_x * size / n
+        mean_y += delta_y * size / n
+    
+    if n < 2 or m2_x == 0 or m2_y == 0:
+        return np.nan
+    return co_moment / np.sqrt(m2_x * m2_y)
+
+
+def get_correlation_matrix(size, n_rows=100, seed=None, n_factors=0):
+    """Correlation matrix of the first `size` variables, sliced from the largest one computed.
+
+    Seeded matrices are cached per (n_rows, seed, n_factors); asking for fewer
+    variables than already computed returns a view into the cached matrix.
+    n_rows is capped at CORRELATION_MAX_ROWS.
+    """
+    n_rows = min(n_rows, CORRELATION_MAX_ROWS)
+    
+    def compute(n_vars, seed):
+        return blocked_correlation(
+            lambda: iter_correlated_blocks(n_rows, n_vars, seed=seed, n_factors=n_factors))
+    
+    if seed is None:
+        # Both passes must see the same data, so fix the entropy up front
+        return compute(size, np.random.SeedSequence().entropy)
+    
+    cache = get_dataset_cache()
+    key = ('correlation_matrix', n_rows, seed, n_factors)
+    full = cache.get(key)
+    if full is None or len(full) < size:
+        full = cache.put(key, compute(size, seed))
+    return full[:size, :size]
+
+
+def top_correlations(corr, k=10):
+    """The k variable pairs with the strongest absolute correlation"""
+    labels = corr.columns if isinstance(corr, pd.DataFrame) else np.arange(len(corr))
+    strength = np.abs(np.asarray(corr, dtype=np.float32))
+    strength = np.nan_to_num(np.triu(strength, 1), nan=0.0)
+    k = min(k, len(strength) * (len(strength) - 1) // 2)
+    flat = np.argpartition(strength.ravel(), -k)[-k:] if k > 0 else np.array([], dtype=np.intp)
+    flat = flat[np.argsort(strength.ravel()[flat])[::-1]]
+    rows, cols = np.unravel_index(flat, strength.shape)
     return pd.DataFrame({
-        'normal': normal_data,
-        'exponential': exponential_data
+        'variable 1': np.asarray(labels)[rows],
+        'variable 2': np.asarray(labels)[cols],
+        'correlation': np.asarray(corr, dtype=np.float32)[rows, cols]
     })
 
 
-def generate_heatmap_data(size=10):
-    """Generate correlation matrix data"""
-    data = np.random.randn(100, size)
-    df = pd.DataFrame(data, columns=[f'Var_{i+1}' for i in range(size)])
-    return df.corr()
+def cluster_order(corr):
+    """Leaf order of an average-linkage clustering on 1 - |r|.
+
+    Uses the nearest-neighbor chain algorithm, so the cost is O(p^2) vector
+    work rather than O(p^3).
+    """
+    dist = 1 - np.abs(np.nan_to_num(np.asarray(corr, dtype=np.float64), nan=0.0))
+    p = len(dist)
+    if p <= 2:
+        return np.arange(p)
+    np.fill_diagonal(dist, np.inf)
+    sizes = np.ones(p)
+    node = np.arange(p)  # tree node currently held in each slot
+    children = np.full((2 * p - 1, 2), -1)
+    next_node = p
+    chain = []
+    
+    for _ in range(p - 1):
+        if not chain:
+            chain.append(int(np.flatnonzero(np.isfinite(sizes))[0]))
+        while True:
+            a = chain[-1]
+            b = int(np.argmin(dist[a]))
+            if len(chain) > 1 and dist[a, chain[-2]] <= dist[a, b]:
+                b = chain[-2]
+            if len(chain) > 1 and b == chain[-2]:
+                break
+            chain.append(b)
+        chain.pop()
+        chain.pop()
+        
+        # Merge slot b into slot a using the average-linkage update
+        merged = (sizes[a] * dist[a] + sizes[b] * dist[b]) / (sizes[a] + sizes[b])
+        dist[a, :] = merged
+        dist[:, a] = merged
+        dist[b, :] = np.inf
+        dist[:, b] = np.inf
+        dist[a, a] = np.inf
+        sizes[a] += sizes[b]
+        sizes[b] = np.inf  # marks slot b as inactive
+        children[next_node] = (node[a], node[b])
+        node[a] = next_node
+        next_node += 1
+    
+    order = []
+    stack = [next_node - 1]
+    while stack:
+        current = stack.pop()
+        if current < p:
+            order.append(current)
+        else:
+            stack.extend(children[current][::-1])
+    return np.array(order)
+
+
+def generate_heatmap_data(size=10, seed=None, lean=False, n_rows=100, n_factors=0):
+    """Generate correlation matrix data.
+
+    Not cached per size: every size is a slice of the one cached matrix per
+    (n_rows, seed, n_factors), so seeded frames are only registered.
+    """
+    corr = get_correlation_matrix(size, n_rows=n_rows, seed=seed, n_factors=n_factors)
+    labels = [f'Var_{i+1}' for i in range(size)]
+    corr = pd.DataFrame(corr.astype(np.float64), index=labels, columns=labels)
+    corr = compact_dtypes(corr) if lean else corr
+    if seed is not None:
+        register_fingerprint(corr, ('generate_heatmap_data', size, seed, lean,
+                                    min(n_rows, CORRELATION_MAX_ROWS), n_factors))
+    return corr
+
+
+# Realtime sensor model shared by generate_realtime_data and the live stream
+REALTIME_CATEGORIES = ['Sensor A', 'Sensor B', 'Sensor C']
+REALTIME_STATUSES = ['Normal', 'Warning', 'Critical']
+REALTIME_STATUS_WEIGHTS = [0.7, 0.2, 0.1]
+REALTIME_BUFFER_CAPACITY = 1000
+
+
+def _realtime_block(rng, n_points, start_value=100.0):
+    """Continue the cumulative random walk from start_value for n_points samples.
+
+    Returns (values, category_codes, status_codes).
+    """
+    values = np.cumsum(rng.standard_normal(n_points)) + start_value
+    categories = rng.integers(0, len(REALTIME_CATEGORIES), n_points).astype(np.int8)
+    statuses = rng.choice(len(REALTIME_STATUSES), n_points,
+                          p=REALTIME_STATUS_WEIGHTS).astype(np.int8)
+    return values, categories, statuses
 
 
-def generate_realtime_data(n_points=50):
+@cached_dataset(anchors={'end': minute_anchor})
+def generate_realtime_data(n_points=50, seed=None, end=None, lean=False):
     """Generate data for animated/realtime visualization"""
-    timestamps = pd.date_range(start=datetime.now() - timedelta(minutes=n_points-1), 
-                               periods=n_points, freq='1min')
-    
-    values = np.cumsum(np.random.randn(n_points)) + 100
-    categories = np.random.choice(['Sensor A', 'Sensor B', 'Sensor C'], n_points)
-    
-    return pd.DataFrame({
-        'timestamp': timestamps,
-        'value': values,
-        'category': categories,
-        'status': np.random.choice(['Normal', 'Warning', 'Critical'], n_points, p=[0.7, 0.2, 0.1])
-    })
+    rng = np.random.default_rng(seed)
+    end = minute_anchor() if end is None else pd.Timestamp(end)
+    timestamps = pd.date_range(end=end, periods=n_points, freq='1min')
+    
+    values, categories, statuses = _realtime_block(rng, n_points)
+    
+    if lean:
+        df = pd.DataFrame({
+            'timestamp': timestamps,
+            'value': values.astype(np.float32),
+            'category': pd.Categorical.from_codes(categories, REALTIME_CATEGORIES),
+            'status': pd.Categorical.from_codes(statuses, REALTIME_STATUSES)
+        })
+    else:
+        df = pd.DataFrame({
+            'timestamp': timestamps,
+            'value': values,
+            'category': np.array(REALTIME_CATEGORIES)[categories],
+            'status': np.array(REALTIME_STATUSES)[statuses]
+        })
+    return mark_time_sorted(df, 'timestamp')
+
+
+class RingBuffer:
+    """Fixed-capacity, append-only columnar buffer backed by NumPy arrays.
+
+    Every sample is written twice, at ``i`` and ``i + capacity``, so the most
+    recent ``capacity`` samples are always one contiguous slice: reading a
+    window is a zero-copy view and appending costs O(new samples).
+    """
+
+    def __init__(self, capacity, dtypes):
+        self.capacity = capacity
+        self._columns = {name: np.zeros(2 * capacity, dtype=dtype)
+                         for name, dtype in dtypes.items()}
+        self._head = 0  # next write position in [0, capacity)
+        self._size = 0
+        self.total_appended = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, **columns):
+        """Append equally sized arrays, one per column"""
+        n_new = len(next(iter(columns.values())))
+        if n_new > self.capacity:
+            # Only the newest samples can survive; skip the rest
+            columns = {name: values[-self.capacity:] for name, values in columns.items()}
+            self.total_appended += n_new - self.capacity
+            n_new = self.capacity
+        
+        positions = (self._head + np.arange(n_new)) % self.capacity
+        for name, values in columns.items():
+            column = self._columns[name]
+            column[positions] = values
+            column[positions + self.capacity] = values
+        
+        self._head = (self._head + n_new) % self.capacity
+        self._size = min(self._size + n_new, self.capacity)
+        self.total_appended += n_new
+
+    def window(self, n=None):
+        """Return zero-copy views of the newest n samples (all by default)"""
+        n = self._size if n is None else min(n, self._size)
+        stop = self._head + self.capacity
+        return {name: column[stop - n:stop] for name, column in self._columns.items()}
+
+
+class RealtimeStream:
+    """Simulated sensor stream that appends to a RingBuffer tick by tick"""
+
+    def __init__(self, seed=None, capacity=REALTIME_BUFFER_CAPACITY, start=None, freq='1min'):
+        self.seed = seed
+        self.step = pd.Timedelta(freq)
+        self.buffer = RingBuffer(capacity, {
+            'timestamp': 'datetime64[ns]',
+            'value': np.float64,
+            'category': np.int8,
+            'status': np.int8,
+        })
+        self._rng = np.random.default_rng(seed)
+        self._last_value = 100.0
+        self.start = minute_anchor() if start is None else pd.Timestamp(start)
+        self._next_timestamp = self.start
+
+    def tick(self, n_new=1):
+        """Generate n_new samples continuing the random walk and append them"""
+        if n_new <= 0:
+            return 0
+        values, categories, statuses = _realtime_block(self._rng, n_new, self._last_value)
+        timestamps = (self._next_timestamp.value
+                      + self.step.value * np.arange(n_new)).astype('datetime64[ns]')
+        self.buffer.append(timestamp=timestamps, value=values,
+                           category=categories, status=statuses)
+        self._last_value = values[-1]
+        self._next_timestamp += self.step * n_new
+        return n_new
+
+    def frame(self, n_points=None):
+        """Newest n_points samples as a DataFrame copied out of the buffer.
+
+        The copy keeps the frame intact once later ticks overwrite the ring.
+        Seeded streams register the frame under the stream's identity and
+        sample count, so derived results are reused until the next tick.
+        """
+        window = {name: values.copy() for name, values in self.buffer.window(n_points).items()}
+        df = mark_time_sorted(pd.DataFrame({
+            'timestamp': window['timestamp'],
+            'value': window['value'],
+            'category': pd.Categorical.from_codes(window['category'], REALTIME_CATEGORIES),
+            'status': pd.Categorical.from_codes(window['status'], REALTIME_STATUSES),
+        }, copy=False), 'timestamp')
+        if self.seed is not None:
+            register_fingerprint(df, ('realtime_stream', self.seed, self.start.value,
+                                      self.step.value, self.buffer.total_appended, len(df)))
+        return df
+
+
+def get_realtime_stream(min_points=0):
+    """Get the session's realtime stream, restarting it when the data seed changes"""
+    stream = st.session_state.get('realtime_stream')
+    if stream is None or stream.seed != get_data_seed():
+        stream = RealtimeStream(seed=get_data_seed())
+        st.session_state.realtime_stream = stream
+    stream.tick(min_points - len(stream.buffer))
+    return stream
+
+
+class LiveTraces:
+    """Per-category chart traces kept in step with a RealtimeStream.
+
+    Each sync splits only the samples appended since the previous one by
+    category and appends them to that category's RingBuffer; traces are
+    zero-copy windows of those buffers. Timestamps are kept as epoch
+    milliseconds so traces go out as typed arrays rather than date strings.
+    Work per tick therefore scales with the new samples, not the window.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffers = [RingBuffer(stream.buffer.capacity, {'x': np.float64, 'y': np.float64})
+                        for _ in REALTIME_CATEGORIES]
+        self.synced = stream.buffer.total_appended - len(stream.buffer)
+
+    def sync(self):
+        """Route the stream's new samples to their category; return how many"""
+        source = self.stream.buffer
+        n_new = min(source.total_appended - self.synced, len(source))
+        if n_new > 0:
+            window = source.window(n_new)
+            x = window['timestamp'].view(np.int64) / 1e6
+            for code, buffer in enumerate(self.buffers):
+                mask = window['category'] == code
+                buffer.append(x=x[mask], y=window['value'][mask])
+        self.synced = source.total_appended
+        return max(n_new, 0)
+
+    def windows(self, n_points):
+        """(x, y) views per category covering the stream's newest n_points samples"""
+        first = self.stream.buffer.window(n_points)['timestamp'][:1].view(np.int64)
+        start = first[0] / 1e6 if len(first) else np.inf
+        windows = []
+        for buffer in self.buffers:
+            window = buffer.window()
+            offset = np.searchsorted(window['x'], start)
+            windows.append((window['x'][offset:], window['y'][offset:]))
+        return windows
+
+
+def get_live_traces(stream):
+    """Get the session's LiveTraces for stream, synced to its newest sample"""
+    traces = st.session_state.get('live_traces')
+    if traces is None or traces.stream is not stream:
+        traces = LiveTraces(stream)
+        st.session_state.live_traces = traces
+    traces.sync()
+    return traces
+
+
+def build_live_figure(windows, chart_type, title=None, template=None, budget=None):
+    """Realtime chart from per-category (x, y) arrays, built without validation.
+
+    Trace dicts reference the arrays directly, so the only per-tick cost that
+    grows with the window is encoding them. With a budget, windows holding
+    more points in total are LTTB-downsampled, each category keeping its
+    share, so the payload per tick stays bounded. ``uirevision`` keeps the
+    user's zoom and legend state while the data keeps changing.
+    """
+    n_points = sum(len(x) for x, _ in windows)
+    if budget is not None and n_points > budget:
+        reduced = []
+        for x, y in windows:
+            share = max(3, budget * len(x) // n_points)
+            if len(x) > share:
+                kept = lttb_indices(x, y, share)
+                x, y = x[kept], y[kept]
+            reduced.append((x, y))
+        windows = reduced
+        n_points = sum(len(x) for x, _ in windows)
+    base = {
+        'Line': {'type': 'scatter', 'mode': 'lines'},
+        'Area': {'type': 'scatter', 'mode': 'lines', 'stackgroup': '1'},
+        'Bar': {'type': 'bar'},
+        'Scatter': {'type': 'scattergl' if scatter_render_mode(n_points) == 'webgl'
+                    else 'scatter', 'mode': 'markers'},
+    }[chart_type]
+    data = [dict(base, x=x, y=y, name=name, legendgroup=name)
+            for name, (x, y) in zip(REALTIME_CATEGORIES, windows)]
+    layout = {
+        'title': {'text': title},
+        'xaxis': {'type': 'date', 'title': {'text': 'timestamp'}},
+        'yaxis': {'title': {'text': 'value'}},
+        'legend': {'title': {'text': 'category'}},
+        'height': 500,
+        'hovermode': 'x unified',
+        'uirevision': chart_type,
+    }
+    return apply_template(go.Figure({'data': data, 'layout': layout}, _validate=False),
+                          template)
+
+
+def show_live_chart(chart_type, n_points, points_per_tick, interval_ms):
+    """Realtime chart that re-runs on its own, appending points_per_tick samples per tick"""
+    @st.fragment(run_every=interval_ms / 1000)
+    def live_chart():
+        stream = get_realtime_stream(min_points=n_points)
+        stream.tick(points_per_tick)
+        traces = get_live_traces(stream)
+        st.caption(f"🔴 Live: {stream.buffer.total_appended} samples streamed, "
+                   f"showing the latest {min(n_points, len(stream.buffer))} "
+                   f"(+{points_per_tick} every {interval_ms} ms)")
+        fig = build_live_figure(traces.windows(n_points), chart_type,
+                                title='Real-Time Sensor Data', budget=get_point_budget())
+        st.plotly_chart(fig, use_container_width=True, key='live_chart')
+    
+    live_chart()
 
 
 def export_data_to_csv(df, filename="data_export"):
@@ -359,40 +1469,1127 @@ def export_data_to_json(df, filename="data_export"):
     return df.to_json(orient='records', date_format='iso').encode('utf-8')
 
 
-def apply_filters(df, filters):
-    """Apply filters to dataframe based on filter settings"""
-    filtered_df = df.copy()
-    
-    # Apply numeric value filters
-    if filters.get('min_value') is not None and 'value' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['value'] >= filters['min_value']]
-    
-    if filters.get('max_value') is not None and 'value' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['value'] <= filters['max_value']]
+# Bulk export: generator name, size parameter and its default value per dataset.
+# The time series grows by sampling frequency; 365k days would overflow Timestamp.
+BULK_EXPORT_DATASETS = {
+    "time_series": ("generate_timeseries_data", "samples_per_day", 1),
+    "sine_wave": ("generate_sine_data", "points", 1000),
+    "scatter": ("generate_scatter_data", "n_points", 500),
+    "distribution": ("generate_distribution_data", "n_samples", 1000),
+    "categorical": ("generate_categorical_data", None, None),
+}
+BULK_EXPORT_SCALES = [1, 10, 100, 1000]
+
+
+def generate_export_dataset(name, seed, scale=1):
+    """Generate one bulk-export dataset at the given size multiplier, uncached"""
+    func_name, size_param, default_size = BULK_EXPORT_DATASETS[name]
+    generator = globals()[func_name].uncached
+    params = {size_param: default_size * scale} if size_param else {}
+    if 'seed' in inspect.signature(generator).parameters:
+        params['seed'] = seed
+    return generator(**params)
+
+
+def build_export_dataset(name, seed, scale=1):
+    """Generate one bulk-export dataset and encode it as CSV.
+
+    Runs in a worker process; returns (name, csv_bytes, rows, seconds).
+    """
+    start = time.perf_counter()
+    data = generate_export_dataset(name, seed, scale)
+    csv = export_data_to_csv(data)
+    return name, csv, len(data), time.perf_counter() - start
+
+
+def generate_all_datasets(seed=None, scale=1, max_workers=None, parallel=True):
+    """Generate and encode every bulk-export dataset, in a process pool when possible.
+
+    Each dataset gets its own child of ``SeedSequence(seed)``, so results are
+    reproducible no matter which worker runs which task. Workers are spawned,
+    not forked from the server, and import this file as a plain module, which
+    has no UI side effects. Falls back to in-process generation with the same
+    seeds only if the pool cannot start; errors raised by a task propagate.
+    Returns {name: {'csv': bytes, 'rows': int, 'seconds': float}}.
+    """
+    names = list(BULK_EXPORT_DATASETS)
+    children = np.random.SeedSequence(seed).spawn(len(names))
+    seeds = [int(child.generate_state(1)[0]) for child in children]
+    
+    results = None
+    if parallel:
+        max_workers = max_workers or min(len(names), os.cpu_count() or 1)
+        worker = build_export_dataset
+        if __name__ == "__main__":
+            # Streamlit runs this file as __main__, which workers cannot unpickle from
+            module = os.path.splitext(os.path.basename(__file__))[0]
+            worker = importlib.import_module(module).build_export_dataset
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = [pool.submit(worker, name, child_seed, scale)
+                           for name, child_seed in zip(names, seeds)]
+                results = [future.result() for future in futures]
+        except (BrokenProcessPool, OSError):
+            # Workers could not start (restricted sandbox, process limits)
+            results = None
+    if results is None:
+        results = [build_export_dataset(name, child_seed, scale)
+                   for name, child_seed in zip(names, seeds)]
+    
+    return {
+        name: {'csv': csv, 'rows': rows, 'seconds': seconds}
+        for name, csv, rows, seconds in results
+    }
+
+
+# Columns the date_range filter applies to, in order of preference
+TIME_COLUMNS = ('date', 'timestamp')
+
+
+@st.cache_resource
+def get_time_sorted_registry():
+    """Sorted time column of marked frames by object id, dropped when the frame is freed"""
+    return {}
+
+
+def mark_time_sorted(df, column):
+    """Record that df is in ascending order of column so range lookups can binary search.
+
+    The mark is tied to this frame object rather than stored in ``df.attrs``,
+    which pandas carries over to reordered results of sort_values, concat etc.
+    """
+    registry = get_time_sorted_registry()
+    frame_id = id(df)
+    if frame_id not in registry or registry[frame_id][0]() is not df:
+        weakref.finalize(df, registry.pop, frame_id, None)
+    registry[frame_id] = (weakref.ref(df), column)
+    return df
+
+
+def is_time_sorted(df, column):
+    """Whether df[column] is ascending: marked frames are trusted, others are checked"""
+    entry = get_time_sorted_registry().get(id(df))
+    if entry is not None and entry[0]() is df and entry[1] == column:
+        return True
+    return df[column].is_monotonic_increasing
+
+
+def get_time_column(df):
+    """Name of the first time column in df, or None"""
+    return next((column for column in TIME_COLUMNS if column in df.columns), None)
+
+
+def time_bounds(df, start, end, column=None):
+    """Resolve [start, end] on a sorted time column to (lo, hi) row positions.
+
+    Frames marked by mark_time_sorted are trusted; others are checked for
+    monotonic order once. Returns None when the column is not sorted.
+    """
+    column = column or get_time_column(df)
+    if not is_time_sorted(df, column):
+        return None
+    values = df[column].to_numpy()
+    lo = values.searchsorted(np.datetime64(pd.Timestamp(start)), side='left')
+    hi = values.searchsorted(np.datetime64(pd.Timestamp(end)), side='right')
+    return int(lo), int(hi)
+
+
+def time_positions(df, start, end, column=None):
+    """Row positions with start <= time <= end: a slice for sorted data, an array otherwise"""
+    column = column or get_time_column(df)
+    bounds = time_bounds(df, start, end, column)
+    if bounds is None:
+        times = df[column]
+        return np.flatnonzero((times >= start) & (times <= end))
+    return slice(*bounds)
+
+
+def time_slice(df, start, end, column=None):
+    """Rows with start <= time <= end: a zero-copy slice for sorted data, a mask otherwise"""
+    column = column or get_time_column(df)
+    bounds = time_bounds(df, start, end, column)
+    if bounds is None:
+        times = df[column]
+        sliced = df[(times >= start) & (times <= end)]
+    else:
+        sliced = mark_time_sorted(df.iloc[bounds[0]:bounds[1]], column)
+    fingerprint = dataset_fingerprint(df)
+    if fingerprint is not None:
+        register_fingerprint(sliced, ('time_slice', fingerprint, column,
+                                      pd.Timestamp(start), pd.Timestamp(end)))
+    return sliced
+
+
+class CategoryIndex:
+    """Sorted row positions per label of one column.
+
+    Built with a single factorize and stable argsort; selecting categories
+    then scatters only their rows into a mask instead of comparing every
+    row's label.
+    """
+
+    def __init__(self, column):
+        codes, labels = pd.factorize(column, sort=False)
+        position_dtype = np.int32 if len(codes) < np.iinfo(np.int32).max else np.int64
+        self.n_rows = len(codes)
+        self.labels = {label: code for code, label in enumerate(labels)}
+        self._order = np.argsort(codes, kind='stable').astype(position_dtype)
+        # codes of missing values are -1 and sort first; skip them
+        self._bounds = np.searchsorted(codes[self._order], np.arange(len(labels) + 1))
+
+    @property
+    def nbytes(self):
+        return self._order.nbytes + self._bounds.nbytes
+
+    def positions(self, label):
+        """Ascending row positions holding label (empty when absent)"""
+        code = self.labels.get(label)
+        if code is None:
+            return self._order[:0]
+        return self._order[self._bounds[code]:self._bounds[code + 1]]
+
+    def counts(self):
+        """Number of rows per label"""
+        return {label: int(self._bounds[code + 1] - self._bounds[code])
+                for label, code in self.labels.items()}
+
+    def mask(self, labels):
+        """Boolean mask of rows whose label is any of labels"""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for label in labels:
+            mask[self.positions(label)] = True
+        return mask
+
+
+@st.cache_resource
+def get_category_index_cache():
+    """Process-wide cache of category indexes that survives Streamlit reruns"""
+    return LRUCache(max_entries=CATEGORY_INDEX_MAX_ENTRIES, max_bytes=CATEGORY_INDEX_MAX_BYTES)
+
+
+def get_category_index(df, column='category'):
+    """CategoryIndex for df[column], built once per dataset fingerprint"""
+    fingerprint = dataset_fingerprint(df)
+    if fingerprint is None:
+        return CategoryIndex(df[column])
+    cache = get_category_index_cache()
+    key = (fingerprint, column)
+    index = cache.get(key)
+    if index is None:
+        index = cache.put(key, CategoryIndex(df[column]))
+    return index
+
+
+def filter_mask(df, filters):
+    """Fuse every active filter into one boolean array; None when no filter applies"""
+    mask = None
+    
+    def combine(predicate):
+        nonlocal mask
+        if mask is None:
+            mask = predicate
+        else:
+            mask &= predicate
+    
+    # Numeric value filters
+    if 'value' in df.columns:
+        values = df['value'].to_numpy()
+        if filters.get('min_value') is not None:
+            combine(values >= filters['min_value'])
+        if filters.get('max_value') is not None:
+            combine(values <= filters['max_value'])
+    
+    # Category filters: precomputed positions for cached datasets, isin otherwise
+    if filters.get('categories') and 'category' in df.columns:
+        if is_registered(df):
+            combine(get_category_index(df).mask(filters['categories']))
+        else:
+            combine(df['category'].isin(filters['categories']).to_numpy())
     
-    # Apply category filters
-    if filters.get('categories') and len(filters['categories']) > 0:
-        if 'category' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['category'].isin(filters['categories'])]
+    # Date range filters: binary search on sorted data, elementwise otherwise
+    time_column = get_time_column(df)
+    if filters.get('date_range') and time_column:
+        start_date, end_date = filters['date_range']
+        bounds = time_bounds(df, start_date, end_date, time_column)
+        if bounds is None:
+            dates = df[time_column]
+            combine(((dates >= start_date) & (dates <= end_date)).to_numpy())
+        else:
+            in_range = np.zeros(len(df), dtype=bool)
+            in_range[bounds[0]:bounds[1]] = True
+            combine(in_range)
     
-    # Apply date range filters
-    if filters.get('date_range') and 'date' in filtered_df.columns:
+    return mask
+
+
+def apply_filters(df, filters):
+    """Apply filters to dataframe based on filter settings.
+
+    A date range on sorted data first narrows the frame to a zero-copy
+    slice; the remaining predicates are evaluated into a single mask and the
+    result is materialized once. When no row is removed the input (or the
+    slice) is returned as is, so callers must not mutate the result in place.
+    """
+    time_column = get_time_column(df)
+    if filters.get('date_range') and time_column:
+        start_date, end_date = filters['date_range']
+        bounds = time_bounds(df, start_date, end_date, time_column)
+        if bounds is not None:
+            df = df.iloc[bounds[0]:bounds[1]]
+            filters = {**filters, 'date_range': None}
+    
+    mask = filter_mask(df, filters)
+    if mask is None or mask.all():
+        return df
+    return df[mask]
+
+
+@st.cache_resource
+def get_filter_cache():
+    """Process-wide cache of filter results that survives Streamlit reruns"""
+    return LRUCache(max_entries=FILTER_CACHE_MAX_ENTRIES, max_bytes=FILTER_CACHE_MAX_BYTES)
+
+
+def normalize_filters(filters, df=None):
+    """Canonical, hashable form of the active filters.
+
+    Inactive entries are dropped, categories are sorted and, when df is
+    given, filters on columns it does not have are ignored.
+    """
+    columns = None if df is None else set(df.columns)
+    
+    def applies(column):
+        return columns is None or column in columns
+    
+    normalized = []
+    for name in ('min_value', 'max_value'):
+        if filters.get(name) is not None and applies('value'):
+            normalized.append((name, float(filters[name])))
+    if filters.get('categories') and applies('category'):
+        normalized.append(('categories', tuple(sorted(map(str, filters['categories'])))))
+    if filters.get('date_range') and (df is None or get_time_column(df)):
         start_date, end_date = filters['date_range']
-        filtered_df = filtered_df[
-            (filtered_df['date'] >= start_date) & 
-            (filtered_df['date'] <= end_date)
-        ]
+        normalized.append(('date_range', (pd.Timestamp(start_date), pd.Timestamp(end_date))))
+    return tuple(normalized)
+
+
+def cached_apply_filters(df, filters):
+    """apply_filters memoized on the dataset fingerprint and normalized filters"""
+    normalized = normalize_filters(filters, df)
+    if not normalized:
+        return df
+    fingerprint = dataset_fingerprint(df)
+    if fingerprint is None:
+        return apply_filters(df, filters)
+    cache = get_filter_cache()
+    key = (fingerprint, normalized)
+    result = cache.get(key)
+    if result is None:
+        result = cache.put(key, apply_filters(df, filters))
+        register_fingerprint(result, ('filtered',) + key)
+    return result
+
+
+def cached_filter_mask(df, filters):
+    """filter_mask memoized like cached_apply_filters; None when no filter applies"""
+    normalized = normalize_filters(filters, df)
+    if not normalized:
+        return None
+    fingerprint = dataset_fingerprint(df)
+    if fingerprint is None:
+        return filter_mask(df, filters)
+    cache = get_filter_cache()
+    key = ('mask', fingerprint, normalized)
+    mask = cache.get(key)
+    if mask is None:
+        mask = cache.put(key, filter_mask(df, filters))
+    return mask
+
+
+def comparison_summary(values, mask):
+    """Rows removed and the change in mean/std when mask is applied to values"""
+    values = np.asarray(values, dtype=np.float64)
+    kept = values if mask is None else values[mask]
+    summary = {
+        'rows_total': len(values),
+        'rows_kept': len(kept),
+        'rows_removed': len(values) - len(kept),
+        'mean_all': values.mean() if len(values) else np.nan,
+        'mean_filtered': kept.mean() if len(kept) else np.nan,
+        'std_all': values.std(ddof=1) if len(values) > 1 else np.nan,
+        'std_filtered': kept.std(ddof=1) if len(kept) > 1 else np.nan,
+    }
+    summary['mean_change'] = summary['mean_filtered'] - summary['mean_all']
+    summary['std_change'] = summary['std_filtered'] - summary['std_all']
+    return summary
+
+
+def invalidate_filter_results(filters):
+    """Drop cached results computed for this filter state; return the number dropped"""
+    normalized = normalize_filters(filters)
     
-    return filtered_df
+    def matches(key):
+        # Stored keys omit filters the dataset had no column for
+        return set(key[1]) <= set(normalized) and bool(key[1])
+    
+    return get_filter_cache().invalidate(matches)
 
 
 def get_chart_template():
     """Get plotly template based on theme"""
-    return 'plotly_dark' if st.session_state.dark_mode else 'plotly_white'
+    return 'plotly_dark' if st.session_state.get('dark_mode', False) else 'plotly_white'
+
+
+def toggle_dark_mode():
+    """Button callback switching between the light and dark theme"""
+    st.session_state.dark_mode = not st.session_state.dark_mode
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide cache of serialized figures that survives Streamlit reruns"""
+    return LRUCache(max_entries=FIGURE_CACHE_MAX_ENTRIES, max_bytes=FIGURE_CACHE_MAX_BYTES)
+
+
+def figure_from_json(payload):
+    """Figure from trusted JSON written by Figure.to_json, skipping plotly's validation"""
+    return go.Figure(json.loads(payload), _validate=False)
+
+
+def apply_template(fig, template=None):
+    """Restyle fig with template (the current theme by default) as a layout patch"""
+    return fig.update_layout(template=pio.templates[template or get_chart_template()])
+
+
+def cached_figure(df, build, chart, template=None, **options):
+    """build() memoized as figure JSON on df's fingerprint, chart and options.
+
+    Stored figures are theme-neutral: the template (the current theme by
+    default) is patched onto the layout of every returned figure, so a
+    theme switch never rebuilds a figure. build must make every other
+    change the chart needs, layout included. Figures are restored from
+    JSON without validation, which also keeps the template patch cheap;
+    each call returns a fresh figure that is safe to modify. Frames
+    without a fingerprint are built on every call.
+    """
+    fingerprint = dataset_fingerprint(df)
+    if fingerprint is None:
+        return apply_template(figure_from_json(build().to_json()), template)
+    cache = get_figure_cache()
+    key = (chart, fingerprint,
+           tuple(sorted((name, _freeze(value)) for name, value in options.items())))
+    payload = cache.get(key)
+    if payload is None:
+        payload = cache.put(key, build().to_json())
+    return apply_template(figure_from_json(payload), template)
+
+
+# Default number of points a line/area chart sends to the browser
+DEFAULT_POINT_BUDGET = 2000
+POINT_BUDGET_OPTIONS = [500, 1000, 2000, 5000, 10000, 50000]
+
+
+def _numeric_axis(values):
+    """Values as float64, with datetimes as nanoseconds since the epoch"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Positions of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    Interior points are split into n_out - 2 buckets evaluated together as one
+    padded matrix. Classic LTTB anchors each bucket on the point chosen in the
+    previous one; here the first pass anchors on the previous bucket's mean
+    and a second pass re-anchors on the first pass's choices, which keeps the
+    selection vectorized while matching LTTB closely. First and last points
+    are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _numeric_axis(x)
+    y = np.asarray(y, dtype=np.float64)
+    
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    offsets = np.arange(sizes.max())
+    valid = offsets[np.newaxis, :] < sizes[:, np.newaxis]
+    index = np.where(valid, edges[:-1, np.newaxis] + offsets, edges[:-1, np.newaxis])
+    bucket_x, bucket_y = x[index], y[index]
+    
+    # Bucket means; the next-bucket anchor of the last bucket is the final point
+    mean_x = np.where(valid, bucket_x, 0).sum(axis=1) / sizes
+    mean_y = np.nansum(np.where(valid, bucket_y, 0), axis=1) / sizes
+    next_x = np.append(mean_x[1:], x[-1])[:, np.newaxis]
+    next_y = np.append(mean_y[1:], y[-1])[:, np.newaxis]
+    prev_x = np.insert(mean_x[:-1], 0, x[0])[:, np.newaxis]
+    prev_y = np.insert(mean_y[:-1], 0, y[0])[:, np.newaxis]
+    
+    rows = np.arange(len(sizes))
+    for _ in range(2):
+        area = np.abs((prev_x - next_x) * (bucket_y - prev_y)
+                      - (prev_x - bucket_x) * (next_y - prev_y))
+        area = np.where(valid, np.nan_to_num(area, nan=-1.0), -np.inf)
+        chosen = index[rows, np.argmax(area, axis=1)]
+        prev_x = np.insert(x[chosen[:-1]], 0, x[0])[:, np.newaxis]
+        prev_y = np.insert(y[chosen[:-1]], 0, y[0])[:, np.newaxis]
+    
+    return np.concatenate(([0], chosen, [n - 1]))
+
+
+def downsample_positions(df, x, y, budget, color=None):
+    """Row positions kept when df is downsampled to about budget points.
+
+    With a color column every group is downsampled on its own, with the
+    budget shared in proportion to group size, so each line keeps its shape.
+    """
+    if budget is None or len(df) <= budget:
+        return np.arange(len(df))
+    if color is None:
+        return lttb_indices(df[x].to_numpy(), df[y].to_numpy(), budget)
+    
+    x_values, y_values = df[x].to_numpy(), df[y].to_numpy()
+    index = get_category_index(df, color)
+    kept = []
+    for label in index.labels:
+        rows = index.positions(label)
+        share = max(3, int(budget * len(rows) / len(df)))
+        kept.append(rows[lttb_indices(x_values[rows], y_values[rows], share)])
+    return np.sort(np.concatenate(kept)) if kept else np.arange(0)
+
+
+def downsample_frame(df, x, y, budget=None, color=None):
+    """df reduced to about budget rows with LTTB; returned as is when already small"""
+    budget = get_point_budget() if budget is None else budget
+    if len(df) <= budget:
+        return df
+    return df.iloc[downsample_positions(df, x, y, budget, color)]
+
+
+def get_point_budget():
+    """Per-chart point budget chosen in the sidebar"""
+    return st.session_state.get('point_budget', DEFAULT_POINT_BUDGET)
+
+
+def points_caption(original, rendered):
+    """Caption comparing original and rendered point counts"""
+    if rendered >= original:
+        return f"📉 Rendering all {original:,} points"
+    return f"📉 Rendering {rendered:,} of {original:,} points (LTTB downsampled)"
+
+
+# Scatter plots above this many points are drawn with WebGL (scattergl) traces
+WEBGL_POINT_THRESHOLD = 1000
+WEBGL_THRESHOLD_OPTIONS = [500, 1000, 2000, 5000, 10000]
+SCATTER_MAX_POINTS = 200_000
+
+
+def get_webgl_threshold():
+    """Point count above which scatter plots switch to WebGL, chosen in the sidebar"""
+    return st.session_state.get('webgl_threshold', WEBGL_POINT_THRESHOLD)
+
+
+def scatter_render_mode(n_points, threshold=None):
+    """'webgl' for scatter plots larger than threshold, 'svg' otherwise"""
+    threshold = get_webgl_threshold() if threshold is None else threshold
+    return 'webgl' if n_points > threshold else 'svg'
+
+
+def build_scatter_figure(df, x, y, color=None, size=None, hover_data=None, title=None,
+                         template='plotly_white', render_mode=None):
+    """px.scatter with SVG or WebGL traces picked by the rendering policy.
+
+    Color groups, size encoding and hover data map onto Scattergl the same
+    way as onto Scatter, so switching never changes what the chart shows.
+    """
+    render_mode = render_mode or scatter_render_mode(len(df))
+    return px.scatter(df, x=x, y=y, color=color, size=size, hover_data=hover_data,
+                      title=title, template=template, render_mode=render_mode)
+
+
+def measure_figure(build):
+    """Build time, serialization time and JSON payload of the figure build() returns"""
+    start = time.perf_counter()
+    fig = build()
+    built = time.perf_counter()
+    payload = fig.to_json()
+    serialized = time.perf_counter()
+    return {
+        'trace': type(fig.data[0]).__name__ if fig.data else None,
+        'build_ms': (built - start) * 1000,
+        'serialize_ms': (serialized - built) * 1000,
+        'payload_kb': len(payload) / 1024,
+    }
+
+
+def scatter_render_costs(df, **kwargs):
+    """measure_figure of both the SVG and the WebGL path, one row each"""
+    rows = {mode: measure_figure(functools.partial(build_scatter_figure, df,
+                                                   render_mode=mode, **kwargs))
+            for mode in ('svg', 'webgl')}
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+# Stratified sampling: share of the sample budget reserved for outliers
+SAMPLE_OUTLIER_SHARE = 0.05
+SAMPLE_BUDGET_RANGE = (500, 20_000)
+
+
+def stratified_sample_positions(df, budget, group=None, columns=('x', 'y'), seed=None,
+                                outlier_share=SAMPLE_OUTLIER_SHARE):
+    """Row positions of a stratified random sample of at most budget rows.
+
+    The minimum and maximum of every column, then the rows with the largest
+    |z-score| (up to outlier_share of the budget), are always kept. The rest
+    of the budget is split across groups in proportion to their size and
+    each group keeps its rows with the smallest random keys (one
+    argpartition per group), so the draw is reproducible for a given seed.
+    Returns (positions, outliers), both sorted; the random part alone is an
+    unbiased sample for estimates such as correlation_estimate.
+    """
+    n = len(df)
+    if n <= budget:
+        return np.arange(n), np.arange(0)
+    rng = np.random.default_rng(seed)
+    
+    extremes = []
+    score = np.full(n, -1.0)
+    for column in columns:
+        values = df[column].to_numpy()
+        extremes += [np.nanargmin(values), np.nanargmax(values)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = np.abs((values - np.nanmean(values)) / np.nanstd(values))
+        np.fmax(score, z, out=score)
+    n_outliers = min(max(int(budget * outlier_share), len(extremes)), budget)
+    top = np.argpartition(score, n - n_outliers)[n - n_outliers:]
+    outliers = np.unique(np.concatenate([extremes, top]))[:budget]
+    
+    if group is None:
+        strata = [np.arange(n)]
+    else:
+        index = get_category_index(df, group)
+        strata = [index.positions(label) for label in sorted(index.labels, key=str)]
+    
+    # Largest-remainder split of the remaining budget, proportional to group size
+    remaining = budget - len(outliers)
+    sizes = np.array([len(rows) for rows in strata])
+    exact = remaining * sizes / max(sizes.sum(), 1)
+    quota = np.floor(exact).astype(np.int64)
+    quota[np.argsort(quota - exact)[:remaining - quota.sum()]] += 1
+    
+    keys = rng.random(n)
+    keys[outliers] = np.inf
+    chosen = [rows[np.argpartition(keys[rows], q)[:q]] if q < len(rows) else rows
+              for rows, q in zip(strata, quota) if q > 0]
+    chosen = np.concatenate(chosen) if chosen else np.arange(0)
+    chosen = chosen[np.isfinite(keys[chosen])]
+    return np.sort(np.concatenate([outliers, chosen])), outliers
+
+
+def cached_sample_positions(df, budget, group=None, columns=('x', 'y'), seed=None):
+    """stratified_sample_positions memoized on the dataset fingerprint"""
+    fingerprint = dataset_fingerprint(df)
+    if fingerprint is None or seed is None:
+        return stratified_sample_positions(df, budget, group, columns, seed)
+    cache = get_filter_cache()
+    key = ('sample', fingerprint, budget, group, tuple(columns), seed)
+    result = cache.get(key)
+    if result is None:
+        result = cache.put(key, stratified_sample_positions(df, budget, group, columns, seed))
+    return result
+
+
+def correlation_estimate(x, y, n_population=None, confidence=0.95):
+    """Pearson r of a sample with a Fisher-z confidence interval.
+
+    n_population applies the finite population correction, so the interval
+    shrinks to nothing as the sample approaches the full data.
+    """
+    m = len(x)
+    r = streaming_pearson(x, y)
+    if m < 4 or not np.isfinite(r):
+        return {'r': r, 'low': np.nan, 'high': np.nan, 'error': np.nan}
+    stderr = 1 / np.sqrt(m - 3)
+    if n_population is not None and n_population > 1:
+        stderr *= np.sqrt(max(n_population - m, 0) / (n_population - 1))
+    z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+    spread = NormalDist().inv_cdf(0.5 + confidence / 2) * stderr
+    low, high = np.tanh(z - spread), np.tanh(z + spread)
+    return {'r': r, 'low': low, 'high': high, 'error': (high - low) / 2}
+
+
+# Density rendering: scatter data binned on the server and sent as one image
+DENSITY_BINS = 400
+DENSITY_CHUNK_ROWS = 1_000_000
+DENSITY_POINT_OPTIONS = [100_000, 1_000_000, 3_000_000, 10_000_000]
+
+
+def density_range(low, high):
+    """(low, high) as floats, widened around its value when it has zero width"""
+    low, high = float(low), float(high)
+    if high > low:
+        return low, high
+    half_width = max(abs(low), 1.0) * 1e-6
+    return low - half_width, low + half_width
+
+
+def density_grid(x, y, x_range, y_range, bins=DENSITY_BINS, groups=None, n_groups=1,
+                 chunk_rows=DENSITY_CHUNK_ROWS):
+    """Point counts per (group, y bin, x bin) inside x_range and y_range.
+
+    Each chunk is binned with arithmetic on whole arrays and one np.bincount
+    over flattened (group, row, column) cell ids, so the cost is linear in
+    the number of points and memory is bounded by one chunk. Zero-width
+    ranges are widened by density_range.
+    """
+    (x0, x1), (y0, y1) = density_range(*x_range), density_range(*y_range)
+    scale_x, scale_y = bins / (x1 - x0), bins / (y1 - y0)
+    counts = np.zeros(n_groups * bins * bins, dtype=np.int64)
+    for start in range(0, len(x), chunk_rows):
+        chunk_x = x[start:start + chunk_rows]
+        chunk_y = y[start:start + chunk_rows]
+        inside = (chunk_x >= x0) & (chunk_x <= x1) & (chunk_y >= y0) & (chunk_y <= y1)
+        # points on the upper edge belong to the last bin
+        col = np.minimum(((chunk_x[inside] - x0) * scale_x).astype(np.int64), bins - 1)
+        row = np.minimum(((chunk_y[inside] - y0) * scale_y).astype(np.int64), bins - 1)
+        cell = row * bins + col
+        if groups is not None:
+            cell += groups[start:start + chunk_rows][inside].astype(np.int64) * (bins * bins)
+        counts += np.bincount(cell, minlength=counts.size)
+    return counts.reshape(n_groups, bins, bins)
+
+
+def density_image(counts, colors=None, colormap='viridis'):
+    """RGBA pixels of a density grid; row 0 is the lowest y bin.
+
+    A single channel is mapped through colormap by log density. Several
+    channels mix their colors (one RGB triple per group) by count, with
+    opacity rising with log density. Empty cells are transparent.
+    """
+    total = counts.sum(axis=0)
+    peak = total.max()
+    level = np.log1p(total) / np.log1p(peak) if peak else np.zeros(total.shape)
+    
+    if len(counts) == 1 or colors is None:
+        rgba = plt.get_cmap(colormap)(level)
+        rgba[..., 3] = total > 0
+    else:
+        with np.errstate(invalid='ignore'):
+            mixed = np.tensordot(counts, np.asarray(colors, dtype=np.float64) / 255, axes=(0, 0))
+            mixed /= total[..., np.newaxis]
+        rgba = np.concatenate([np.nan_to_num(mixed), (0.25 + 0.75 * level)[..., np.newaxis]], axis=-1)
+        rgba[..., 3] *= total > 0
+    return (rgba * 255).round().astype(np.uint8)
+
+
+def image_data_uri(rgba):
+    """PNG data URI of an RGBA array whose row 0 is the bottom of the image"""
+    buffer = io.BytesIO()
+    plt.imsave(buffer, rgba, format='png', origin='lower')
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def build_density_figure(df, x='x', y='y', color=None, x_range=None, y_range=None,
+                         bins=DENSITY_BINS, template='plotly_white'):
+    """Scatter data rendered as one server-side density image.
+
+    Only the PNG of the bins inside the visible ranges reaches the browser,
+    whatever the number of points; with color each group gets its own
+    channel. Returns the figure and the count grid.
+    """
+    x_values, y_values = df[x].to_numpy(), df[y].to_numpy()
+    x_range = density_range(*(x_range or (x_values.min(), x_values.max())))
+    y_range = density_range(*(y_range or (y_values.min(), y_values.max())))
+    
+    if color is None:
+        codes, labels = None, [None]
+    else:
+        codes, labels = pd.factorize(df[color], sort=True)
+    counts = density_grid(x_values, y_values, x_range, y_range, bins=bins,
+                          groups=codes, n_groups=len(labels))
+    
+    palette = px.colors.qualitative.Plotly
+    colors = [px.colors.hex_to_rgb(palette[i % len(palette)]) for i in range(len(labels))]
+    (x0, x1), (y0, y1) = x_range, y_range
+    
+    fig = go.Figure()
+    fig.add_layout_image(source=image_data_uri(density_image(counts, colors if color else None)),
+                         xref='x', yref='y', x=x0, y=y1, sizex=x1 - x0, sizey=y1 - y0,
+                         sizing='stretch', layer='below')
+    # Invisible corners give the axes their extent; marker-only traces fill the legend
+    fig.add_trace(go.Scatter(x=[x0, x1], y=[y0, y1], mode='markers', marker_opacity=0,
+                             showlegend=False, hoverinfo='skip'))
+    if color is not None:
+        for label, rgb in zip(labels, colors):
+            fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', name=str(label),
+                                     marker=dict(color=f'rgb{tuple(rgb)}', size=10)))
+    fig.update_xaxes(range=[x0, x1], title=x)
+    fig.update_yaxes(range=[y0, y1], title=y)
+    fig.update_layout(template=template,
+                      title=f'Density of {len(df):,} points ({bins}×{bins} bins)')
+    return fig, counts
+
+
+# Slider ranges of the Wave Patterns page: (min, max, step)
+WAVE_SLIDER_RANGES = {
+    'frequency': (0.5, 5.0, 0.1),
+    'amplitude': (0.5, 3.0, 0.1),
+    'phase': (0.0, 2 * np.pi, 0.1),
+}
+WAVE_SLIDER_DEFAULTS = {'frequency': 1.0, 'amplitude': 1.0, 'phase': 0.0}
+PRERENDER_VALUE_BUDGET = 60_000  # y values shipped across all frames
+PRERENDER_POINT_RANGE = (100, 1000)
+
+
+def plan_frame_grid(n_frames, value_budget=PRERENDER_VALUE_BUDGET,
+                    point_range=PRERENDER_POINT_RANGE):
+    """Choose (frames, points per frame) so frames * points stays within the budget"""
+    min_points, max_points = point_range
+    n_frames = max(1, min(n_frames, value_budget // min_points))
+    points = int(np.clip(value_budget // n_frames, min_points, max_points))
+    return n_frames, points
+
+
+def build_wave_animation(sweep='phase', frequency=1.0, amplitude=1.0, phase=0.0,
+                         value_budget=PRERENDER_VALUE_BUDGET, template='plotly_white'):
+    """Figure with one pre-rendered frame per value of the swept slider.
+
+    All frames come from a single wave_matrix call and scrubbing the slider
+    replays them in the browser without a server round trip. Frame and point
+    counts are chosen by plan_frame_grid to bound the payload.
+    """
+    low, high, step = WAVE_SLIDER_RANGES[sweep]
+    n_frames, points = plan_frame_grid(int(round((high - low) / step)) + 1, value_budget)
+    sweep_values = np.linspace(low, high, n_frames)
+    params = {'frequency': frequency, 'amplitude': amplitude, 'phase': phase}
+    grid = {name: np.full(n_frames, value) for name, value in params.items()}
+    grid[sweep] = sweep_values
+    
+    x = np.linspace(0, 4 * np.pi, points)
+    frames_y = wave_matrix(x, grid['frequency'], grid['amplitude'], grid['phase']).astype(np.float32)
+    y_limit = 1.05 * np.abs(frames_y).max()
+    labels = [f'{value:.2f}' for value in sweep_values]
+    
+    fig = go.Figure(
+        data=[go.Scatter(x=x.astype(np.float32), y=frames_y[0], mode='lines')],
+        frames=[go.Frame(data=[go.Scatter(y=y)], name=label)
+                for y, label in zip(frames_y, labels)]
+    )
+    frame_args = {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate',
+                  'transition': {'duration': 0}}
+    fig.update_layout(
+        title=f'Sine Wave: scrub {sweep} ({n_frames} frames × {points} points)',
+        template=template,
+        height=450,
+        yaxis=dict(range=[-y_limit, y_limit]),
+        sliders=[dict(
+            currentvalue={'prefix': f'{sweep.title()}: '},
+            steps=[dict(method='animate', label=label, args=[[label], frame_args])
+                   for label in labels]
+        )],
+        updatemenus=[dict(
+            type='buttons', showactive=False, x=0, y=-0.15, xanchor='left',
+            buttons=[dict(label='▶ Play', method='animate',
+                          args=[None, {**frame_args, 'frame': {'duration': 50, 'redraw': False},
+                                       'fromcurrent': True}])]
+        )]
+    )
+    return fig
+
+
+def build_comparison_figure(df, mask, x='date', y='value', color=None,
+                            template='plotly_white'):
+    """Side-by-side filtered/unfiltered panes drawn from one dataset.
+
+    Both panes share the x values and a linked x-axis; rows removed by mask
+    show as gaps on the filtered side instead of being regenerated.
+    """
+    fig = make_subplots(rows=1, cols=2, shared_xaxes='all', shared_yaxes='all',
+                        subplot_titles=('With Filters', 'Without Filters'))
+    x_values = df[x].to_numpy()
+    y_values = df[y].to_numpy()
+    filtered_y = y_values if mask is None else np.where(mask, y_values, np.nan)
+    
+    if color is None:
+        groups = [(None, slice(None))]
+    else:
+        index = get_category_index(df, color)
+        groups = [(label, index.positions(label)) for label in sorted(index.labels)]
+    
+    palette = px.colors.qualitative.Plotly
+    for i, (label, rows) in enumerate(groups):
+        line = dict(color=palette[i % len(palette)])
+        for col, pane_y in ((1, filtered_y), (2, y_values)):
+            fig.add_trace(go.Scatter(x=x_values[rows], y=pane_y[rows], mode='lines',
+                                     name=label or y, legendgroup=label or y,
+                                     showlegend=col == 1 and label is not None, line=line),
+                          row=1, col=col)
+    
+    fig.update_layout(template=template, height=400, hovermode='x unified')
+    return fig
+
+
+# Distribution statistics computed on the server; traces carry only aggregates
+KDE_GRID_SIZE = 200
+BOX_WHISKER_IQR = 1.5
+BOX_MAX_OUTLIERS = 50
+
+
+def _finite(values):
+    """values as a float64 array without NaN or infinities"""
+    values = np.asarray(values, dtype=np.float64)
+    return values[np.isfinite(values)]
+
+
+def histogram_stats(values, bins=50):
+    """Bin counts and edges of values from one np.histogram call"""
+    return np.histogram(_finite(values), bins=bins)
+
+
+def box_stats(values, whisker=BOX_WHISKER_IQR, max_outliers=BOX_MAX_OUTLIERS):
+    """Quartiles, whiskers, mean and the most extreme outliers of values.
+
+    The quartiles come from one np.quantile call; whiskers end at the last
+    points within whisker * IQR of the box, as in Plotly's own box plots.
+    At most max_outliers points beyond the whiskers are kept, farthest first.
+    Empty or all-NaN input gives NaN statistics and no outliers.
+    """
+    values = _finite(values)
+    if len(values) == 0:
+        return {'q1': np.nan, 'median': np.nan, 'q3': np.nan, 'mean': np.nan,
+                'lowerfence': np.nan, 'upperfence': np.nan, 'outliers': values}
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    reach = whisker * (q3 - q1)
+    inside = values[(values >= q1 - reach) & (values <= q3 + reach)]
+    outliers = values[(values < q1 - reach) | (values > q3 + reach)]
+    if len(outliers) > max_outliers:
+        distance = np.abs(outliers - median)
+        outliers = outliers[np.argpartition(distance, -max_outliers)[-max_outliers:]]
+    return {'q1': q1, 'median': median, 'q3': q3, 'mean': values.mean(),
+            'lowerfence': inside.min(), 'upperfence': inside.max(),
+            'outliers': np.sort(outliers)}
+
+
+def kde_stats(values, grid_size=KDE_GRID_SIZE, bandwidth=None):
+    """Gaussian kernel density of values on a fixed grid.
+
+    Samples are linearly binned onto the grid with two np.bincount calls and
+    the counts convolved with the sampled kernel, so the cost after binning
+    depends on the grid size alone. The bandwidth defaults to Silverman's
+    rule. Returns (grid, density), both empty for empty or all-NaN input.
+    """
+    values = _finite(values)
+    n = len(values)
+    if n == 0:
+        return values, values
+    if bandwidth is None:
+        q1, q3 = np.quantile(values, [0.25, 0.75])
+        spread = min(values.std(ddof=1), (q3 - q1) / 1.34) if n > 1 else 0
+        bandwidth = 1.06 * (spread or values.std() or 1.0) * n ** -0.2
+    
+    lo, hi = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    grid = np.linspace(lo, hi, grid_size)
+    step = grid[1] - grid[0]
+    position = (values - lo) / step
+    left = np.minimum(position.astype(np.int64), grid_size - 2)
+    right_share = position - left
+    weights = (np.bincount(left, 1 - right_share, minlength=grid_size)
+               + np.bincount(left + 1, right_share, minlength=grid_size))
+    
+    half = int(np.ceil(4 * bandwidth / step))
+    kernel = np.exp(-0.5 * (np.arange(-half, half + 1) * step / bandwidth) ** 2)
+    density = np.convolve(weights, kernel)[half:half + grid_size]
+    return grid, density / (n * bandwidth * np.sqrt(2 * np.pi))
+
+
+def build_histogram_figure(values, bins=50, title=None, name=None, stats=None):
+    """Histogram drawn as bars over server-side bin counts.
+
+    ``stats`` takes precomputed (counts, edges), e.g. from SampleBuffer.histogram,
+    in which case values are not read.
+    """
+    counts, edges = histogram_stats(values, bins) if stats is None else stats
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                           name=name, hovertemplate='%{x:.2f}: %{y}<extra></extra>'))
+    return fig.update_layout(title=title, bargap=0, xaxis_title=name, yaxis_title='count')
+
+
+def _box_trace(stats, position, name, color, width=None, show_outliers=True):
+    """Precomputed go.Box at a numeric position plus its outlier markers"""
+    if np.isnan(stats['median']):
+        return [go.Box(x=[], name=name, marker_color=color, showlegend=width is None)]
+    traces = [go.Box(x=[position], q1=[stats['q1']], median=[stats['median']],
+                     q3=[stats['q3']], mean=[stats['mean']],
+                     lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+                     name=name, marker_color=color, width=width, boxpoints=False,
+                     showlegend=width is None)]
+    if show_outliers and len(stats['outliers']):
+        traces.append(go.Scatter(x=np.full(len(stats['outliers']), position),
+                                 y=stats['outliers'], mode='markers', name=name,
+                                 marker=dict(color=color, size=4), showlegend=False))
+    return traces
+
+
+def _category_axis(fig, names):
+    """Label numeric trace positions 0..n-1 with names"""
+    return fig.update_xaxes(tickvals=list(range(len(names))), ticktext=list(names))
+
+
+def build_box_figure(df, columns, title=None):
+    """Box plots of df's columns from server-side quartiles and whiskers"""
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, column in enumerate(columns):
+        fig.add_traces(_box_trace(box_stats(df[column]), i, column.title(),
+                                  palette[i % len(palette)]))
+    return _category_axis(fig, [column.title() for column in columns]).update_layout(title=title)
+
+
+def build_violin_figure(df, columns, title=None, grid_size=KDE_GRID_SIZE):
+    """Violins drawn as filled outlines of server-side KDEs, with an inner box"""
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, column in enumerate(columns):
+        color = palette[i % len(palette)]
+        grid, density = kde_stats(df[column], grid_size)
+        half_width = density * (0.4 / density.max()) if len(density) else density
+        fig.add_trace(go.Scatter(x=np.concatenate([i + half_width, (i - half_width)[::-1]]),
+                                 y=np.concatenate([grid, grid[::-1]]),
+                                 fill='toself', mode='lines', line=dict(color=color, width=1),
+                                 name=column.title(), hoveron='fills'))
+        fig.add_traces(_box_trace(box_stats(df[column]), i, column.title(), color,
+                                  width=0.08, show_outliers=False))
+    return _category_axis(fig, [column.title() for column in columns]).update_layout(title=title)
+
+
+def show_lazy_panels(panels, key):
+    """Selector-driven replacement for st.tabs that renders only the active panel.
+
+    panels maps view names to callables. The selector and the active panel
+    run inside a fragment, so switching views reruns just this block, and
+    the other panels are neither computed nor sent to the browser. Panels
+    that build through cached_figure keep their figures for when they are
+    shown again.
+    """
+    @st.fragment
+    def render():
+        active = st.radio("View", list(panels), horizontal=True, key=key,
+                          label_visibility='collapsed')
+        panels[active]()
+    
+    render()
+
+
+# Static (matplotlib/seaborn) rendering
+SEABORN_MAX_VARIABLES = 20  # larger matrices take the fast imshow path
+ANNOT_MAX_VARIABLES = 60
+ANNOT_MAX_LABELS = 200
+STATIC_THEMES = {
+    'light': {'background': 'white', 'foreground': 'black'},
+    'dark': {'background': '#0e1117', 'foreground': '#fafafa'},
+}
+
+
+@st.cache_resource
+def get_static_render_cache():
+    """Process-wide cache of rendered PNG/SVG bytes that survives Streamlit reruns"""
+    return LRUCache(max_entries=STATIC_RENDER_MAX_ENTRIES, max_bytes=STATIC_RENDER_MAX_BYTES)
+
+
+def matrix_fingerprint(matrix):
+    """Exact identity of a matrix: shape, dtype, labels and a digest of its values"""
+    values = np.ascontiguousarray(np.asarray(matrix))
+    labels = ()
+    if isinstance(matrix, pd.DataFrame):
+        labels = tuple(map(str, matrix.index)) + tuple(map(str, matrix.columns))
+    label_bytes = '\0'.join(labels).encode('utf-8', 'surrogatepass')
+    return (values.shape, str(values.dtype),
+            hashlib.blake2b(label_bytes, digest_size=16).hexdigest(),
+            hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest())
+
+
+def annotate_strongest(ax, values, max_labels=ANNOT_MAX_LABELS):
+    """Label the max_labels strongest off-diagonal cells of a heatmap drawn with imshow.
+
+    Cells are picked with one argpartition and labels formatted in one
+    vectorized call; only the chosen cells become text artists.
+    """
+    n = len(values)
+    strength = np.nan_to_num(np.abs(values).astype(np.float64), nan=-1.0)
+    np.fill_diagonal(strength, -1.0)
+    k = min(max_labels, n * n - n)
+    if k <= 0:
+        return
+    cells = np.argpartition(strength.ravel(), -k)[-k:]
+    rows, cols = np.unravel_index(cells, values.shape)
+    picked = values[rows, cols]
+    labels = np.char.mod('%.2f', picked)
+    colors = np.where(np.abs(picked) > 0.6, 'white', 'black')
+    fontsize = max(4, min(10, 280 / n))  # fits "-0.00" in a cell of a 12-inch figure
+    for row, col, label, color in zip(rows, cols, labels, colors):
+        ax.text(col, row, label, ha='center', va='center', fontsize=fontsize, color=color)
+
+
+def draw_correlation_heatmap(ax, matrix, cmap='coolwarm', annot=True):
+    """Seaborn heatmap for small matrices, imshow with thinned labels for larger ones"""
+    n = len(matrix)
+    if n <= SEABORN_MAX_VARIABLES:
+        sns.heatmap(matrix, annot=annot, fmt='.2f', cmap=cmap, center=0, square=True, ax=ax)
+        return
+    
+    values = np.asarray(matrix, dtype=np.float64)
+    image = ax.imshow(values, cmap=cmap, vmin=-1, vmax=1, interpolation='nearest')
+    ax.figure.colorbar(image, ax=ax)
+    ticks = np.arange(0, n, max(1, n // 40))
+    labels = np.asarray(matrix.columns if isinstance(matrix, pd.DataFrame) else ticks)[ticks]
+    ax.set_xticks(ticks, labels, rotation=90, fontsize=7)
+    ax.set_yticks(ticks, labels, fontsize=7)
+    if annot and n <= ANNOT_MAX_VARIABLES:
+        annotate_strongest(ax, values)
+
+
+def render_correlation_image(matrix, fmt='png', size=(12, 10), cmap='coolwarm', theme='light',
+                             annot=True, title='Correlation Matrix with Annotations', dpi=100):
+    """Correlation heatmap rendered to PNG or SVG bytes.
+
+    Draws on a standalone Figure that pyplot never registers, and clears it
+    once saved, so no figure outlives the call.
+    """
+    colors = STATIC_THEMES[theme]
+    fig = Figure(figsize=size, dpi=dpi, facecolor=colors['background'])
+    try:
+        ax = fig.subplots()
+        draw_correlation_heatmap(ax, matrix, cmap=cmap, annot=annot)
+        ax.set_title(title)
+        for axis in fig.axes:  # heatmap and colorbar
+            axis.tick_params(colors=colors['foreground'])
+            axis.title.set_color(colors['foreground'])
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, facecolor=colors['background'], bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def cached_correlation_image(matrix, fmt='png', size=(12, 10), cmap='coolwarm', theme='light',
+                             annot=True):
+    """render_correlation_image memoized on (matrix fingerprint, size, cmap, theme, format)"""
+    cache = get_static_render_cache()
+    key = ('correlation', matrix_fingerprint(matrix), tuple(size), cmap, theme, fmt, annot)
+    image = cache.get(key)
+    if image is None:
+        image = cache.put(key, render_correlation_image(matrix, fmt=fmt, size=size, cmap=cmap,
+                                                        theme=theme, annot=annot))
+    return image
 
 
 # Main App
 def main():
+    setup_page()
     st.title("📊 Data Visualization Dashboard")
     st.markdown("### Interactive visualizations with dummy data")
     
@@ -414,11 +2611,10 @@ def main():
     st.sidebar.markdown("---")
     st.sidebar.markdown("### ⚡ Quick Actions")
     
-    # Functional Dark Mode Toggle
+    # Dark Mode Toggle: the callback flips the theme before the rerun, and cached
+    # figures are only re-templated, so no data or figure is rebuilt
     dark_mode_label = "🌙 Dark Mode" if not st.session_state.dark_mode else "☀️ Light Mode"
-    if st.sidebar.button(dark_mode_label, use_container_width=True):
-        st.session_state.dark_mode = not st.session_state.dark_mode
-        st.rerun()
+    st.sidebar.button(dark_mode_label, use_container_width=True, on_click=toggle_dark_mode)
     
     # Comparison Mode Toggle
     comparison_label = "📊 Enable Comparison" if not st.session_state.comparison_mode else "📊 Disable Comparison"
@@ -426,8 +2622,9 @@ def main():
         st.session_state.comparison_mode = not st.session_state.comparison_mode
         st.rerun()
     
-    # Data refresh
+    # Data refresh: a new seed selects a new set of cached datasets
     if st.sidebar.button("🔄 Refresh All Data", use_container_width=True):
+        st.session_state.data_seed += 1
         st.rerun()
     
     st.sidebar.markdown("---")
@@ -449,6 +2646,7 @@ def main():
     
     # Clear filters
     if st.sidebar.button("🗑️ Clear All Filters", use_container_width=True):
+        invalidate_filter_results(st.session_state.filters)
         st.session_state.filters = {
             'min_value': None,
             'max_value': None,
@@ -466,6 +2664,21 @@ def main():
     theme_emoji = "🌙" if st.session_state.dark_mode else "☀️"
     st.sidebar.metric("Current Theme", f"{theme_emoji} {'Dark' if st.session_state.dark_mode else 'Light'}")
     
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 🖥️ Rendering")
+    st.sidebar.select_slider("Points per chart", options=POINT_BUDGET_OPTIONS,
+                             value=DEFAULT_POINT_BUDGET, key='point_budget',
+                             help="Line and area charts are LTTB downsampled to this many points")
+    st.sidebar.select_slider("WebGL above (points)", options=WEBGL_THRESHOLD_OPTIONS,
+                             value=WEBGL_POINT_THRESHOLD, key='webgl_threshold',
+                             help="Scatter plots with more points are drawn with WebGL")
+    
+    cache_stats = get_dataset_cache().stats()
+    st.sidebar.caption(
+        f"🗄️ Dataset cache: {cache_stats['entries']} entries, "
+        f"{cache_stats['bytes'] / 1e6:.1f} MB, {cache_stats['hits']} hits"
+    )
+    
     # Page routing
     if page == "Overview":
         show_overview()
@@ -509,20 +2722,27 @@ def show_overview():
     
     with col1:
         st.subheader("Sample Time Series")
-        ts_data = generate_timeseries_data(days=90)
-        fig = px.line(ts_data, x='date', y='value', 
-                      title='Time Series Preview',
-                      template='plotly_white')
-        fig.update_layout(height=300)
+        ts_data = generate_timeseries_data(days=90, seed=get_data_seed())
+        
+        def build():
+            fig = px.line(downsample_frame(ts_data, 'date', 'value'), x='date', y='value', 
+                          title='Time Series Preview')
+            return fig.update_layout(height=300)
+        
+        fig = cached_figure(ts_data, build, 'overview_line',
+                            budget=get_point_budget())
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         st.subheader("Sample Distribution")
-        dist_data = generate_distribution_data(500)
-        fig = px.histogram(dist_data, x='normal', 
-                          title='Distribution Preview',
-                          template='plotly_white')
-        fig.update_layout(height=300)
+        dist_data = generate_distribution_data(500, seed=get_data_seed())
+        
+        def build():
+            fig = build_histogram_figure(dist_data['normal'], title='Distribution Preview',
+                                         name='normal')
+            return fig.update_layout(height=300)
+        
+        fig = cached_figure(dist_data, build, 'overview_histogram')
         st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("---")
@@ -560,49 +2780,70 @@ def show_timeseries():
         apply_filter = st.checkbox("Apply Filters", value=True)
     
     # Generate and plot data
-    data = generate_timeseries_data(days=days)
+    full_data = generate_timeseries_data(days=days, seed=get_data_seed())
+    data = full_data
     
-    # Apply filters if enabled
-    if apply_filter:
-        data_before_filter = len(data)
-        data = apply_filters(data, st.session_state.filters)
-        data_after_filter = len(data)
-        if data_before_filter != data_after_filter:
-            st.success(f"✅ Filtered: {data_before_filter} → {data_after_filter} data points")
+    # Comparison mode derives both panes from the same dataset and one mask
+    if st.session_state.comparison_mode:
+        mask = cached_filter_mask(full_data, st.session_state.filters)
+        if apply_filter and mask is not None:
+            data = full_data[mask]
+    elif apply_filter:
+        data = cached_apply_filters(full_data, st.session_state.filters)
+    
+    if apply_filter and len(data) != len(full_data):
+        st.success(f"✅ Filtered: {len(full_data)} → {len(data)} data points")
+    
+    # Zooming slices the sorted data and re-bins only the visible window
+    first = full_data['date'].iloc[0].to_pydatetime()
+    last = full_data['date'].iloc[-1].to_pydatetime()
+    zoom = st.slider("Zoom window", min_value=first, max_value=last, value=(first, last),
+                     format="YYYY-MM-DD")
+    zoom_start, zoom_end = pd.Timestamp(zoom[0]), pd.Timestamp(zoom[1])
+    color = 'category' if show_category else None
     
-    # Comparison mode
     if st.session_state.comparison_mode:
-        col1, col2 = st.columns(2)
+        visible = time_positions(full_data, zoom_start, zoom_end)
+        window = full_data.iloc[visible]
+        rows = downsample_positions(window, 'date', 'value', get_point_budget(), color)
+        window_mask = None if mask is None else mask[visible][rows]
+        fig = cached_figure(full_data,
+                            functools.partial(build_comparison_figure, window.iloc[rows],
+                                              window_mask, color=color),
+                            'timeseries_comparison',
+                            filters=normalize_filters(st.session_state.filters, full_data),
+                            show_category=show_category, zoom=zoom, budget=get_point_budget())
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(points_caption(len(window), len(rows)))
         
+        summary = comparison_summary(full_data['value'], mask)
+        col1, col2, col3 = st.columns(3)
         with col1:
-            st.subheader("Filtered Data")
-            filtered_data = apply_filters(data, st.session_state.filters)
-            fig1 = px.line(filtered_data, x='date', y='value', color='category' if show_category else None,
-                         title='With Filters',
-                         template=get_chart_template())
-            fig1.update_layout(height=400)
-            st.plotly_chart(fig1, use_container_width=True)
-        
+            st.metric("Rows Removed", f"{summary['rows_removed']:,}",
+                      f"{-summary['rows_removed'] / max(summary['rows_total'], 1):.1%}")
         with col2:
-            st.subheader("All Data")
-            fig2 = px.line(generate_timeseries_data(days=days), x='date', y='value', 
-                         color='category' if show_category else None,
-                         title='Without Filters',
-                         template=get_chart_template())
-            fig2.update_layout(height=400)
-            st.plotly_chart(fig2, use_container_width=True)
+            st.metric("Mean (filtered)", f"{summary['mean_filtered']:.2f}",
+                      f"{summary['mean_change']:+.2f}")
+        with col3:
+            st.metric("Std Dev (filtered)", f"{summary['std_filtered']:.2f}",
+                      f"{summary['std_change']:+.2f}")
     else:
-        if show_category:
-            fig = px.line(data, x='date', y='value', color='category',
-                         title='Time Series by Category',
-                         template=get_chart_template())
-        else:
-            fig = px.line(data, x='date', y='value',
-                         title='Time Series Data',
-                         template=get_chart_template())
+        def build():
+            window = time_slice(data, zoom_start, zoom_end)
+            rendered = downsample_frame(window, 'date', 'value', color=color)
+            if show_category:
+                fig = px.line(rendered, x='date', y='value', color='category',
+                             title='Time Series by Category')
+            else:
+                fig = px.line(rendered, x='date', y='value',
+                             title='Time Series Data')
+            return fig.update_layout(height=500, hovermode='x unified',
+                                     meta={'original': len(window), 'rendered': len(rendered)})
         
-        fig.update_layout(height=500, hovermode='x unified')
+        fig = cached_figure(data, build, 'timeseries_line',
+                            show_category=show_category, zoom=zoom, budget=get_point_budget())
         st.plotly_chart(fig, use_container_width=True)
+        st.caption(points_caption(fig.layout.meta['original'], fig.layout.meta['rendered']))
     
     # Statistics
     st.subheader("Statistics")
@@ -626,31 +2867,105 @@ def show_scatter():
     st.header("Scatter Plot Analysis")
     
     # Controls
+    rendering = st.radio("Rendering", ["Points", "Sample", "Density"], horizontal=True,
+                         help="Sample draws a stratified subset; Density bins the points "
+                              "on the server and sends one image")
     col1, col2 = st.columns(2)
     with col1:
-        n_points = st.slider("Number of points", 100, 2000, 500)
+        if rendering == "Density":
+            n_points = st.select_slider("Number of points", DENSITY_POINT_OPTIONS, 1_000_000)
+        else:
+            n_points = st.slider("Number of points", 100, SCATTER_MAX_POINTS, 500, 100)
     with col2:
         color_by_group = st.checkbox("Color by group", value=True)
     
+    if rendering == "Density":
+        show_scatter_density(n_points, color_by_group)
+        return
+    
     # Generate and plot data
-    data = generate_scatter_data(n_points=n_points)
+    data = generate_scatter_data(n_points=n_points, seed=get_data_seed())
+    shown = data
+    budget = None
+    
+    if rendering == "Sample":
+        budget = st.slider("Sample budget", *SAMPLE_BUDGET_RANGE, 2000, 500)
+        positions, outliers = cached_sample_positions(
+            data, budget, group='group', seed=get_data_seed())
+        shown = data.iloc[positions]
+    
+    chart_options = dict(x='x', y='y', size='size', hover_data=['size'],
+                         color='group' if color_by_group else None,
+                         title='Scatter Plot with Groups' if color_by_group else 'Scatter Plot')
+    render_mode = scatter_render_mode(len(shown))
+    
+    def build():
+        fig = build_scatter_figure(shown, render_mode=render_mode, **chart_options)
+        return fig.update_layout(height=600)
+    
+    fig = cached_figure(data, build, 'scatter', rendering=rendering,
+                        color_by_group=color_by_group, render_mode=render_mode,
+                        budget=budget)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"🖌️ {len(shown):,} points drawn with {render_mode.upper()} "
+               f"(WebGL above {get_webgl_threshold():,})")
     
-    if color_by_group:
-        fig = px.scatter(data, x='x', y='y', color='group', size='size',
-                        title='Scatter Plot with Groups',
-                        template='plotly_white',
-                        hover_data=['size'])
+    if st.checkbox("⏱️ Compare SVG and WebGL rendering cost"):
+        costs = scatter_render_costs(shown, **chart_options)
+        st.dataframe(costs.style.format({'build_ms': '{:.1f}', 'serialize_ms': '{:.1f}',
+                                         'payload_kb': '{:.0f}'}),
+                     use_container_width=True)
+    
+    # Correlation
+    if rendering == "Sample":
+        # Estimated from the random draws only; forced outliers would bias it
+        drawn = np.setdiff1d(positions, outliers, assume_unique=True)
+        estimate = correlation_estimate(data['x'].to_numpy()[drawn], data['y'].to_numpy()[drawn],
+                                        n_population=len(data))
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Correlation (X vs Y, sample)", f"{estimate['r']:.3f}",
+                      help=f"95% interval {estimate['low']:.3f} to {estimate['high']:.3f}")
+            st.caption(f"± {estimate['error']:.3f} (95% confidence)")
+        with col2:
+            st.metric("Sample Fraction", f"{len(shown) / len(data):.1%}")
+            st.caption(f"{len(shown):,} of {len(data):,} points, "
+                       f"including {len(outliers):,} outliers")
     else:
-        fig = px.scatter(data, x='x', y='y', size='size',
-                        title='Scatter Plot',
-                        template='plotly_white',
-                        hover_data=['size'])
+        correlation = streaming_pearson(data['x'].to_numpy(), data['y'].to_numpy())
+        st.metric("Correlation (X vs Y)", f"{correlation:.3f}")
+
+
+def show_scatter_density(n_points, color_by_group):
+    """Density view of the Scatter page: zooming re-bins the visible region"""
+    data = generate_scatter_data(n_points=n_points, seed=get_data_seed(), lean=True)
+    x_values, y_values = data['x'].to_numpy(), data['y'].to_numpy()
+    x_extent = (float(np.floor(x_values.min())), float(np.ceil(x_values.max())))
+    y_extent = (float(np.floor(y_values.min())), float(np.ceil(y_values.max())))
     
-    fig.update_layout(height=600)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        x_range = st.slider("X range", *x_extent, x_extent, 0.1)
+    with col2:
+        y_range = st.slider("Y range", *y_extent, y_extent, 0.1)
+    with col3:
+        bins = st.slider("Bins per axis", 100, 800, DENSITY_BINS, 50)
+    
+    def build():
+        fig, counts = build_density_figure(data, color='group' if color_by_group else None,
+                                           x_range=x_range, y_range=y_range, bins=bins)
+        fig.update_layout(height=600, meta={'in_view': int(counts.sum())})
+        return fig
+    
+    fig = cached_figure(data, build, 'scatter_density',
+                        color_by_group=color_by_group, x_range=x_range, y_range=y_range,
+                        bins=bins)
     st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"🧮 {fig.layout.meta['in_view']:,} of {len(data):,} points in view, "
+               f"binned to {bins}×{bins} cells; payload {len(fig.to_json()) / 1024:.0f} KB")
     
-    # Correlation
-    correlation = data['x'].corr(data['y'])
+    # Correlation over every point, not just the visible region
+    correlation = streaming_pearson(x_values, y_values)
     st.metric("Correlation (X vs Y)", f"{correlation:.3f}")
 
 
@@ -658,85 +2973,85 @@ def show_distributions():
     st.header("Distribution Analysis")
     
     # Controls
-    n_samples = st.slider("Number of samples", 500, 5000, 1000)
+    col1, col2 = st.columns(2)
+    with col1:
+        n_samples = st.slider("Number of samples", 500, 100_000, 1000, 500)
+    with col2:
+        nbins = st.slider("Histogram bins", 10, 200, 50, 10)
     
-    # Generate data
-    data = generate_distribution_data(n_samples=n_samples)
+    # Generate data; moving the slider only draws or drops the difference
+    seed = get_data_seed()
+    data = generate_distribution_data(n_samples=n_samples, seed=seed)
     
-    # Create tabs for different distribution views
-    tab1, tab2, tab3 = st.tabs(["Histograms", "Box Plots", "Violin Plots"])
+    def histogram_figure(column, title):
+        # Bin counts are updated from the samples added or dropped since the last size
+        stats = distribution_buffer(seed, n_samples).histogram(column, n_samples, nbins)
+        return build_histogram_figure(None, nbins, title=title, name=column,
+                                      stats=stats).update_layout(height=400)
     
-    with tab1:
+    # Only the selected view is built; built figures stay in the figure cache
+    def histograms():
         col1, col2 = st.columns(2)
         
         with col1:
-            fig = px.histogram(data, x='normal', 
-                             title='Normal Distribution',
-                             template='plotly_white',
-                             nbins=50)
-            fig.update_layout(height=400)
+            fig = cached_figure(data, lambda: histogram_figure('normal', 'Normal Distribution'),
+                                'histogram', column='normal', nbins=nbins)
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
-            fig = px.histogram(data, x='exponential', 
-                             title='Exponential Distribution',
-                             template='plotly_white',
-                             nbins=50)
-            fig.update_layout(height=400)
+            fig = cached_figure(
+                data, lambda: histogram_figure('exponential', 'Exponential Distribution'),
+                'histogram', column='exponential', nbins=nbins)
             st.plotly_chart(fig, use_container_width=True)
     
-    with tab2:
-        fig = go.Figure()
-        fig.add_trace(go.Box(y=data['normal'], name='Normal'))
-        fig.add_trace(go.Box(y=data['exponential'], name='Exponential'))
-        fig.update_layout(title='Box Plots Comparison', 
-                         template='plotly_white',
-                         height=500)
+    def box_plots():
+        fig = cached_figure(data, lambda: build_box_figure(
+            data, ['normal', 'exponential'], title='Box Plots Comparison'
+        ).update_layout(height=500), 'box')
         st.plotly_chart(fig, use_container_width=True)
     
-    with tab3:
-        fig = go.Figure()
-        fig.add_trace(go.Violin(y=data['normal'], name='Normal', box_visible=True))
-        fig.add_trace(go.Violin(y=data['exponential'], name='Exponential', box_visible=True))
-        fig.update_layout(title='Violin Plots Comparison', 
-                         template='plotly_white',
-                         height=500)
+    def violin_plots():
+        fig = cached_figure(data, lambda: build_violin_figure(
+            data, ['normal', 'exponential'], title='Violin Plots Comparison'
+        ).update_layout(height=500), 'violin')
         st.plotly_chart(fig, use_container_width=True)
+    
+    show_lazy_panels({"Histograms": histograms, "Box Plots": box_plots,
+                      "Violin Plots": violin_plots}, key='distribution_view')
 
 
 def show_categorical():
     st.header("Categorical Data Analysis")
     
     # Generate data
-    data = generate_categorical_data()
-    
-    # Create tabs
-    tab1, tab2, tab3 = st.tabs(["Bar Chart", "Pie Chart", "Grouped Bar"])
-    
-    with tab1:
-        fig = px.bar(data, x='category', y='value',
-                    title='Bar Chart',
-                    template='plotly_white',
-                    color='value',
-                    color_continuous_scale='Blues')
-        fig.update_layout(height=500)
+    data = generate_categorical_data(seed=get_data_seed())
+    
+    # Only the selected view is built; built figures stay in the figure cache
+    def bar_chart():
+        fig = cached_figure(data, lambda: px.bar(data, x='category', y='value',
+                                                 title='Bar Chart',
+                                                 color='value',
+                                                 color_continuous_scale='Blues'
+                                                 ).update_layout(height=500), 'bar')
         st.plotly_chart(fig, use_container_width=True)
     
-    with tab2:
-        fig = px.pie(data, values='value', names='category',
-                    title='Pie Chart',
-                    template='plotly_white')
-        fig.update_layout(height=500)
+    def pie_chart():
+        fig = cached_figure(data, lambda: px.pie(data, values='value', names='category',
+                                                 title='Pie Chart').update_layout(height=500),
+                            'pie')
         st.plotly_chart(fig, use_container_width=True)
     
-    with tab3:
-        fig = px.bar(data, x='category', y='value', color='subcategory',
-                    title='Grouped Bar Chart',
-                    template='plotly_white',
-                    barmode='group')
-        fig.update_layout(height=500)
+    def grouped_bar():
+        fig = cached_figure(data, lambda: px.bar(data, x='category', y='value',
+                                                 color='subcategory',
+                                                 title='Grouped Bar Chart',
+                                                 barmode='group').update_layout(height=500),
+                            'grouped_bar')
         st.plotly_chart(fig, use_container_width=True)
     
+    show_lazy_panels({"Bar Chart": bar_chart, "Pie Chart": pie_chart,
+                      "Grouped Bar": grouped_bar}, key='categorical_view')
+    
     # Show data
     st.subheader("Data Table")
     st.dataframe(data, use_container_width=True)
@@ -746,15 +3061,27 @@ def show_correlation():
     st.header("Correlation Analysis")
     
     # Controls
-    matrix_size = st.slider("Number of variables", 5, 15, 10)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        matrix_size = st.slider("Number of variables", 5, 500, 10)
+    with col2:
+        n_rows = st.select_slider("Number of observations",
+                                  options=CORRELATION_ROW_OPTIONS, value=100)
+    with col3:
+        n_factors = st.slider("Latent factors", 0, 5, 0)
+        cluster = st.checkbox("Cluster variables", value=False)
     
-    # Generate data
-    corr_data = generate_heatmap_data(size=matrix_size)
+    # Generate data: smaller sizes are sliced from the largest matrix computed so far
+    corr_data = generate_heatmap_data(size=matrix_size, seed=get_data_seed(),
+                                      n_rows=n_rows, n_factors=n_factors)
+    if cluster:
+        order = cluster_order(corr_data.values)
+        corr_data = corr_data.iloc[order, order]
     
     # Create heatmap
     fig = px.imshow(corr_data,
                    title='Correlation Heatmap',
-                   template='plotly_white',
+                   template=get_chart_template(),
                    color_continuous_scale='RdBu',
                    aspect='auto',
                    zmin=-1, zmax=1)
@@ -762,69 +3089,99 @@ def show_correlation():
     fig.update_layout(height=600)
     st.plotly_chart(fig, use_container_width=True)
     
+    # Strongest pairs
+    st.subheader("Strongest Correlations")
+    top_k = st.slider("Number of pairs", 5, 50, 10)
+    st.dataframe(top_correlations(corr_data, k=top_k), use_container_width=True, hide_index=True)
+    
     # Alternative visualization with seaborn
     st.subheader("Alternative Visualization (Seaborn)")
     
-    fig, ax = plt.subplots(figsize=(12, 10))
-    sns.heatmap(corr_data, annot=True, fmt='.2f', cmap='coolwarm', 
-                center=0, square=True, ax=ax)
-    plt.title('Correlation Matrix with Annotations')
-    st.pyplot(fig)
+    image_format = st.radio("Image format", ["PNG", "SVG"], horizontal=True)
+    image = cached_correlation_image(corr_data, fmt=image_format.lower(),
+                                     theme='dark' if st.session_state.dark_mode else 'light')
+    st.image(image.decode() if image_format == "SVG" else image)
+    if matrix_size > SEABORN_MAX_VARIABLES:
+        st.caption(f"⚡ Fast path: imshow with the {ANNOT_MAX_LABELS} strongest pairs labelled"
+                   if matrix_size <= ANNOT_MAX_VARIABLES else "⚡ Fast path: imshow, no labels")
+    st.download_button(f"⬇️ Download {image_format}", image,
+                       file_name=f"correlation.{image_format.lower()}",
+                       mime='image/svg+xml' if image_format == "SVG" else 'image/png')
 
 
 def show_wave_patterns():
     st.header("Wave Patterns & Sine Waves")
     
-    # Controls
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        frequency = st.slider("Frequency", 0.5, 5.0, 1.0, 0.1)
-    with col2:
-        amplitude = st.slider("Amplitude", 0.5, 3.0, 1.0, 0.1)
-    with col3:
-        phase = st.slider("Phase", 0.0, 2*np.pi, 0.0, 0.1)
-    
-    # Generate wave data
-    wave_data = generate_sine_data(frequency=frequency, 
-                                   amplitude=amplitude, 
-                                   phase=phase)
-    
-    # Plot single wave
-    fig = px.line(wave_data, x='x', y='y',
-                 title=f'Sine Wave (f={frequency}, A={amplitude}, φ={phase:.2f})',
-                 template='plotly_white')
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
+    # Controls: the same ranges set the pre-rendered animation's frame grid
+    params = {}
+    for column, (name, (low, high, step)) in zip(st.columns(3), WAVE_SLIDER_RANGES.items()):
+        with column:
+            params[name] = st.slider(name.title(), low, high, WAVE_SLIDER_DEFAULTS[name], step)
+    frequency, amplitude, phase = params['frequency'], params['amplitude'], params['phase']
+    
+    # Client-side exploration: every frame is shipped once and scrubbed in the browser
+    explore = st.checkbox("🎞️ Client-side exploration (pre-rendered frames)", value=False)
+    
+    if explore:
+        sweep = st.radio("Parameter to scrub", ["phase", "frequency", "amplitude"],
+                         horizontal=True)
+        fig = build_wave_animation(sweep=sweep, frequency=frequency,
+                                   amplitude=amplitude, phase=phase,
+                                   template=get_chart_template())
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"📦 {len(fig.frames)} frames, payload {len(fig.to_json()) / 1024:.0f} KB")
+    else:
+        # Generate wave data
+        wave_data = generate_sine_data(frequency=frequency, 
+                                       amplitude=amplitude, 
+                                       phase=phase)
+        
+        # Plot single wave
+        rendered = downsample_frame(wave_data, 'x', 'y')
+        fig = px.line(rendered, x='x', y='y',
+                     title=f'Sine Wave (f={frequency}, A={amplitude}, φ={phase:.2f})',
+                     template=get_chart_template())
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(points_caption(len(wave_data), len(rendered)))
     
     # Multiple waves comparison
     st.subheader("Multiple Waves Comparison")
     
-    waves = []
-    for i, (f, a) in enumerate([(1, 1), (2, 0.5), (3, 0.3)]):
-        wave = generate_sine_data(frequency=f, amplitude=a, points=1000)
-        wave['wave'] = f'Wave {i+1} (f={f}, A={a})'
-        waves.append(wave)
+    combined_waves = generate_wave_data([(1, 1, 0), (2, 0.5, 0), (3, 0.3, 0)], points=1000)
     
-    combined_waves = pd.concat(waves)
-    
-    fig = px.line(combined_waves, x='x', y='y', color='wave',
+    rendered = downsample_frame(combined_waves, 'x', 'y', color='wave')
+    fig = px.line(rendered, x='x', y='y', color='wave',
                  title='Multiple Sine Waves',
-                 template='plotly_white')
+                 template=get_chart_template())
     fig.update_layout(height=500)
     st.plotly_chart(fig, use_container_width=True)
+    st.caption(points_caption(len(combined_waves), len(rendered)))
+    
+    # Superposition of many waves
+    st.subheader("Wave Superposition")
+    
+    n_waves = st.slider("Number of superimposed harmonics", 1, 500, 10)
+    superposed = generate_wave_data(square_wave_harmonics(n_waves), points=2000, superpose=True)
+    
+    rendered = downsample_frame(superposed, 'x', 'y')
+    fig = px.line(rendered, x='x', y='y',
+                 title=f'Square Wave from {n_waves} Odd Harmonics',
+                 template=get_chart_template())
+    fig.update_layout(height=400)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(points_caption(len(superposed), len(rendered)))
     
     # 3D surface plot
     st.subheader("3D Wave Surface")
     
-    x = np.linspace(-5, 5, 50)
-    y = np.linspace(-5, 5, 50)
-    X, Y = np.meshgrid(x, y)
-    Z = np.sin(np.sqrt(X**2 + Y**2))
+    resolution = st.slider("Surface resolution", 20, 400, 50, 10)
+    x, y, z = generate_wave_surface(resolution=resolution)
     
-    fig = go.Figure(data=[go.Surface(z=Z, x=X, y=Y, colorscale='Viridis')])
+    fig = go.Figure(data=[go.Surface(z=z, x=x, y=y, colorscale='Viridis')])
     fig.update_layout(title='3D Sine Wave Surface',
                      scene=dict(xaxis_title='X', yaxis_title='Y', zaxis_title='Z'),
+                     template=get_chart_template(),
                      height=600)
     st.plotly_chart(fig, use_container_width=True)
 
@@ -843,39 +3200,70 @@ def show_animated_charts():
     col1, col2 = st.columns(2)
     
     with col1:
-        n_points = st.slider("Number of data points", 20, 100, 50)
+        n_points = st.slider("Number of data points", 20, 500, 50)
         animation_speed = st.slider("Animation speed (ms)", 50, 500, 100)
     
     with col2:
         chart_type = st.selectbox("Chart Type", ["Line", "Bar", "Scatter", "Area"])
         show_status = st.checkbox("Show status indicators", value=True)
+        points_per_tick = st.slider("New points per tick", 1, 50, 5)
+        live = st.toggle("🔴 Live updates", value=False,
+                         help="Advance the stream every animation interval; only the chart re-runs")
     
-    # Generate data
-    data = generate_realtime_data(n_points=n_points)
+    # Stream data from the session's ring buffer
+    stream = get_realtime_stream(min_points=n_points)
+    if not live and st.button("⏭️ Advance Stream"):
+        stream.tick(points_per_tick)
+    data = stream.frame(n_points)
     
     # Create animated chart
     st.subheader("Simulated Real-Time Data Stream")
     
-    if chart_type == "Line":
-        fig = px.line(data, x='timestamp', y='value', color='category',
-                     title='Real-Time Sensor Data',
-                     template='plotly_white')
-    elif chart_type == "Bar":
-        fig = px.bar(data, x='timestamp', y='value', color='category',
-                    title='Real-Time Sensor Data',
-                    template='plotly_white')
-    elif chart_type == "Scatter":
-        fig = px.scatter(data, x='timestamp', y='value', color='category',
-                        size=[10]*len(data),
-                        title='Real-Time Sensor Data',
-                        template='plotly_white')
-    else:  # Area
-        fig = px.area(data, x='timestamp', y='value', color='category',
-                     title='Real-Time Sensor Data',
-                     template='plotly_white')
-    
-    fig.update_layout(height=500, hovermode='x unified')
-    st.plotly_chart(fig, use_container_width=True)
+    if live:
+        show_live_chart(chart_type, n_points, points_per_tick, animation_speed)
+        st.caption("Status and animation below refresh on the next full rerun.")
+    else:
+        st.caption(f"📡 {stream.buffer.total_appended} samples streamed, "
+                   f"showing the latest {len(data)}")
+        
+        sample_size = None
+        if chart_type == "Scatter":
+            sample_size = st.slider("Sampled points", 10, n_points, n_points,
+                                    help="Stratified by category; extreme values are always kept")
+        
+        def build():
+            shown = data
+            if chart_type == "Line":
+                shown = downsample_frame(data, 'timestamp', 'value', color='category')
+                fig = px.line(shown, x='timestamp', y='value', color='category',
+                             title='Real-Time Sensor Data')
+            elif chart_type == "Bar":
+                fig = px.bar(data, x='timestamp', y='value', color='category',
+                            title='Real-Time Sensor Data')
+            elif chart_type == "Scatter":
+                positions, _ = stratified_sample_positions(data, sample_size, group='category',
+                                                           columns=('value',),
+                                                           seed=get_data_seed())
+                shown = data.iloc[positions]
+                fig = build_scatter_figure(shown, x='timestamp', y='value', color='category',
+                                           size=[10]*len(shown),
+                                           title='Real-Time Sensor Data')
+            else:  # Area
+                shown = downsample_frame(data, 'timestamp', 'value', color='category')
+                fig = px.area(shown, x='timestamp', y='value', color='category',
+                             title='Real-Time Sensor Data')
+            return fig.update_layout(height=500, hovermode='x unified',
+                                     meta={'shown': len(shown)})
+        
+        fig = cached_figure(data, build, 'realtime', chart_type=chart_type,
+                            sample=sample_size, budget=get_point_budget())
+        shown = fig.layout.meta['shown']
+        if chart_type == "Scatter":
+            st.caption(f"🎯 Showing {shown:,} of {len(data):,} points "
+                       f"({shown / len(data):.0%} sample)")
+        elif chart_type in ("Line", "Area"):
+            st.caption(points_caption(len(data), shown))
+        st.plotly_chart(fig, use_container_width=True)
     
     # Status indicators
     if show_status:
@@ -904,13 +3292,13 @@ def show_animated_charts():
     st.subheader("🎯 Time-Based Animation")
     
     # Create frames for animation
-    data['frame'] = pd.cut(range(len(data)), bins=10, labels=range(10))
+    data = data.assign(frame=pd.cut(range(len(data)), bins=10, labels=range(10)))
     
     fig = px.scatter(data, x='timestamp', y='value', 
                     color='category', size='value',
                     animation_frame='frame',
                     title='Animated Time Series',
-                    template='plotly_white',
+                    template=get_chart_template(),
                     range_y=[data['value'].min()-10, data['value'].max()+10])
     
     fig.update_layout(height=500)
@@ -938,7 +3326,7 @@ def show_data_export():
     data_type = st.selectbox(
         "Choose the type of data to export",
         ["Time Series", "Sine Wave", "Scatter Data", "Distribution Data", 
-         "Categorical Data", "Correlation Matrix", "Real-Time Data"]
+         "Categorical Data", "Correlation Matrix", "Real-Time Data", "Multi-Series"]
     )
     
     # Generate selected data
@@ -946,42 +3334,53 @@ def show_data_export():
     
     col1, col2 = st.columns(2)
     
+    with col2:
+        lean = st.checkbox("Lean dtypes (categorical labels, float32)", value=False)
+    
     with col1:
         if data_type == "Time Series":
             days = st.slider("Days of data", 30, 730, 365)
-            data = generate_timeseries_data(days=days)
-            preview_data = data
+            make_data = functools.partial(generate_timeseries_data, days=days,
+                                          seed=get_data_seed())
             
         elif data_type == "Sine Wave":
             frequency = st.slider("Frequency", 0.5, 5.0, 1.0, 0.1)
             amplitude = st.slider("Amplitude", 0.5, 3.0, 1.0, 0.1)
             points = st.slider("Number of points", 100, 5000, 1000)
-            data = generate_sine_data(frequency=frequency, amplitude=amplitude, points=points)
-            preview_data = data
+            make_data = functools.partial(generate_sine_data, frequency=frequency,
+                                          amplitude=amplitude, points=points)
             
         elif data_type == "Scatter Data":
             n_points = st.slider("Number of points", 100, 5000, 500)
-            data = generate_scatter_data(n_points=n_points)
-            preview_data = data
+            make_data = functools.partial(generate_scatter_data, n_points=n_points,
+                                          seed=get_data_seed())
             
         elif data_type == "Distribution Data":
             n_samples = st.slider("Number of samples", 500, 10000, 1000)
-            data = generate_distribution_data(n_samples=n_samples)
-            preview_data = data
+            make_data = functools.partial(generate_distribution_data, n_samples=n_samples,
+                                          seed=get_data_seed())
             
         elif data_type == "Categorical Data":
-            data = generate_categorical_data()
-            preview_data = data
+            make_data = functools.partial(generate_categorical_data, seed=get_data_seed())
             
         elif data_type == "Correlation Matrix":
             size = st.slider("Matrix size", 5, 20, 10)
-            data = generate_heatmap_data(size=size)
-            preview_data = data
+            make_data = functools.partial(generate_heatmap_data, size=size,
+                                          seed=get_data_seed())
             
-        else:  # Real-Time Data
+        elif data_type == "Real-Time Data":
             n_points = st.slider("Number of points", 20, 200, 50)
-            data = generate_realtime_data(n_points=n_points)
-            preview_data = data
+            make_data = functools.partial(generate_realtime_data, n_points=n_points,
+                                          seed=get_data_seed())
+            
+        else:  # Multi-Series
+            n_series = st.slider("Number of series", 10, 5000, 100)
+            days = st.slider("Days of data", 30, 730, 365)
+            make_data = functools.partial(generate_multi_series_data, n_series=n_series,
+                                          periods=days + 1, seed=get_data_seed())
+        
+        data = make_data(lean=lean)
+        preview_data = data
     
     with col2:
         export_format = st.selectbox(
@@ -994,6 +3393,11 @@ def show_data_export():
         st.metric("Data Points", len(data))
         st.metric("Columns", len(data.columns) if hasattr(data, 'columns') else 'N/A')
     
+    # Memory footprint of the standard versus lean representation
+    with st.expander("💾 Memory Report"):
+        st.dataframe(memory_report(make_data(lean=False), make_data(lean=True)),
+                     use_container_width=True)
+    
     # Preview
     st.subheader("3️⃣ Preview Data")
     
@@ -1043,29 +3447,31 @@ def show_data_export():
     # Bulk export option
     st.subheader("5️⃣ Bulk Export (All Data Types)")
     
+    scale = st.select_slider("Dataset size multiplier", options=BULK_EXPORT_SCALES, value=1)
+    
     if st.button("📦 Generate All Datasets", use_container_width=True):
         with st.spinner("Generating all datasets..."):
-            all_datasets = {
-                "time_series": generate_timeseries_data(),
-                "sine_wave": generate_sine_data(),
-                "scatter": generate_scatter_data(),
-                "distribution": generate_distribution_data(),
-                "categorical": generate_categorical_data(),
-            }
+            start = time.perf_counter()
+            all_datasets = generate_all_datasets(seed=get_data_seed(), scale=scale)
+            total_seconds = time.perf_counter() - start
             
-            st.success("✅ All datasets generated!")
+            st.success(f"✅ All datasets generated in {total_seconds:.2f}s!")
+            st.dataframe(pd.DataFrame([
+                {'dataset': name, 'rows': result['rows'],
+                 'wall time (s)': round(result['seconds'], 3),
+                 'size (KB)': round(len(result['csv']) / 1024, 1)}
+                for name, result in all_datasets.items()
+            ]), use_container_width=True, hide_index=True)
             
-            for name, dataset in all_datasets.items():
-                csv = export_data_to_csv(dataset)
+            for name, result in all_datasets.items():
                 st.download_button(
                     label=f"⬇️ Download {name.replace('_', ' ').title()}",
-                    data=csv,
+                    data=result['csv'],
                     file_name=f"{name}_{timestamp}.csv",
                     mime="text/csv",
                     key=f"download_{name}"
                 )
 
-
 if __name__ == "__main__":
     main()
 
@@ -1,10 +1,18 @@
 import pytest
 import pandas as pd
 import numpy as np
+import io
+import os
+import json
+import subprocess
+import sys
+import time
+import plotly.express as px
 from app import (
     generate_sine_data,
     generate_timeseries_data,
     generate_scatter_data,
+    SCATTER_GROUPS,
     generate_categorical_data,
     generate_distribution_data,
     generate_heatmap_data,
@@ -12,7 +20,81 @@ from app import (
     export_data_to_csv,
     export_data_to_json,
     apply_filters,
-    get_chart_template
+    get_chart_template,
+    LRUCache,
+    get_dataset_cache,
+    estimate_nbytes,
+    iter_timeseries_chunks,
+    write_timeseries_csv,
+    generate_multi_series_data,
+    generate_all_datasets,
+    BULK_EXPORT_DATASETS,
+    BULK_EXPORT_SCALES,
+    generate_export_dataset,
+    RingBuffer,
+    RealtimeStream,
+    compact_dtypes,
+    memory_report,
+    blocked_correlation,
+    CORRELATION_MAX_ROWS,
+    iter_correlated_blocks,
+    get_correlation_matrix,
+    top_correlations,
+    cluster_order,
+    wave_matrix,
+    generate_wave_data,
+    square_wave_harmonics,
+    generate_wave_surface,
+    plan_frame_grid,
+    WAVE_SLIDER_RANGES,
+    build_wave_animation,
+    PRERENDER_VALUE_BUDGET,
+    filter_mask,
+    time_bounds,
+    time_slice,
+    is_time_sorted,
+    dataset_fingerprint,
+    normalize_filters,
+    cached_apply_filters,
+    invalidate_filter_results,
+    get_filter_cache,
+    CategoryIndex,
+    get_category_index,
+    cached_filter_mask,
+    comparison_summary,
+    build_comparison_figure,
+    lttb_indices,
+    downsample_positions,
+    downsample_frame,
+    time_positions,
+    scatter_render_mode,
+    build_scatter_figure,
+    scatter_render_costs,
+    streaming_pearson,
+    density_grid,
+    density_image,
+    build_density_figure,
+    stratified_sample_positions,
+    cached_sample_positions,
+    correlation_estimate,
+    get_figure_cache,
+    cached_figure,
+    figure_from_json,
+    get_static_render_cache,
+    matrix_fingerprint,
+    render_correlation_image,
+    cached_correlation_image,
+    histogram_stats,
+    box_stats,
+    kde_stats,
+    build_histogram_figure,
+    build_box_figure,
+    build_violin_figure,
+    sample_buffer,
+    get_sample_buffer_cache,
+    distribution_buffer,
+    LiveTraces,
+    build_live_figure,
 )
 
 
@@ -474,6 +556,1671 @@ class TestDarkModeAndFilters:
         assert all(cat in ['A', 'B'] for cat in filtered_df['category'])
 
 
+class TestDatasetCache:
+    """Test suite for the seeded dataset cache"""
+    
+    def setup_method(self):
+        get_dataset_cache().clear()
+    
+    def test_same_seed_returns_cached_frame(self):
+        """Test that identical parameters and seed hit the cache"""
+        df1 = generate_timeseries_data(days=30, seed=7)
+        df2 = generate_timeseries_data(days=30, seed=7)
+        
+        assert df1 is df2
+        assert get_dataset_cache().stats()['hits'] == 1
+    
+    def test_different_seed_changes_data(self):
+        """Test that bumping the seed produces a different dataset"""
+        df1 = generate_scatter_data(n_points=100, seed=1)
+        df2 = generate_scatter_data(n_points=100, seed=2)
+        
+        assert df1 is not df2
+        assert not np.allclose(df1['x'], df2['x'])
+    
+    def test_seed_is_reproducible_without_cache(self):
+        """Test that a seed reproduces the same values after eviction"""
+        df1 = generate_distribution_data(n_samples=200, seed=3)
+        get_dataset_cache().clear()
+        df2 = generate_distribution_data(n_samples=200, seed=3)
+        
+        assert df1 is not df2
+        pd.testing.assert_frame_equal(df1, df2)
+    
+    def test_unseeded_calls_bypass_cache(self):
+        """Test that seed=None keeps generators random and uncached"""
+        generate_scatter_data(n_points=50)
+        generate_scatter_data(n_points=50)
+        
+        assert len(get_dataset_cache()) == 0
+    
+    def test_timestamps_anchored_to_day(self, monkeypatch):
+        """Test that time series dates are anchored at midnight"""
+        clock = pd.Timestamp('2024-03-10 23:59:59.999')
+        monkeypatch.setattr(pd.Timestamp, 'now', classmethod(lambda cls, tz=None: clock))
+        df = generate_timeseries_data(days=10, seed=1)
+        
+        assert df['date'].iloc[-1] == pd.Timestamp('2024-03-10')
+        assert (df['date'].dt.hour == 0).all()
+    
+    def test_explicit_end_is_part_of_key(self):
+        """Test that a different anchor produces a different cache entry"""
+        df1 = generate_realtime_data(n_points=10, seed=1, end='2024-01-01 12:00')
+        df2 = generate_realtime_data(n_points=10, seed=1, end='2024-01-01 12:01')
+        
+        assert df1 is not df2
+        assert df1['timestamp'].iloc[-1] == pd.Timestamp('2024-01-01 12:00')
+    
+    def test_lru_evicts_by_entry_count(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = LRUCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+    
+    def test_lru_respects_memory_budget(self):
+        """Test that entries are evicted to stay within the byte budget"""
+        cache = LRUCache(max_entries=10, max_bytes=2500)
+        for key in range(3):
+            cache.put(key, np.zeros(100))  # 800 bytes each
+        cache.put('big', np.zeros(200))  # 1600 bytes
+        
+        assert cache.total_bytes <= 2500
+        assert 'big' in cache
+        assert 0 not in cache and 1 not in cache
+    
+    def test_lru_skips_values_over_budget(self):
+        """Test that a value larger than the budget is not stored"""
+        cache = LRUCache(max_bytes=100)
+        value = cache.put('huge', np.zeros(1000))
+        
+        assert len(value) == 1000
+        assert len(cache) == 0
+    
+    def test_lru_invalidate(self):
+        """Test predicate-based invalidation"""
+        cache = LRUCache()
+        cache.put(('x', 1), 1)
+        cache.put(('y', 1), 2)
+        
+        assert cache.invalidate(lambda key: key[0] == 'x') == 1
+        assert ('y', 1) in cache
+
+
+class TestTimeseriesStreaming:
+    """Test suite for chunked time series generation"""
+    
+    def test_chunks_have_bounded_size(self):
+        """Test that every chunk holds at most chunk_size rows"""
+        chunks = list(iter_timeseries_chunks(1050, freq='min', chunk_size=100, seed=1))
+        
+        assert len(chunks) == 11
+        assert all(len(chunk) <= 100 for chunk in chunks)
+        assert sum(len(chunk) for chunk in chunks) == 1050
+    
+    def test_chunking_does_not_change_series(self):
+        """Test that the concatenated series is independent of chunk size"""
+        kwargs = dict(freq='s', seed=5, end='2024-01-01')
+        small = pd.concat(iter_timeseries_chunks(999, chunk_size=64, **kwargs),
+                          ignore_index=True)
+        whole = next(iter_timeseries_chunks(999, chunk_size=999, **kwargs))
+        
+        pd.testing.assert_frame_equal(small, whole)
+    
+    def test_timestamps_continuous_across_chunks(self):
+        """Test that timestamps advance by exactly one step across boundaries"""
+        chunks = list(iter_timeseries_chunks(500, freq='min', chunk_size=128, seed=2,
+                                             end='2024-06-01'))
+        dates = pd.concat([chunk['date'] for chunk in chunks], ignore_index=True)
+        
+        assert (dates.diff().dropna() == pd.Timedelta('1min')).all()
+        assert dates.iloc[-1] == pd.Timestamp('2024-06-01')
+    
+    def test_numpy_chunks(self):
+        """Test the NumPy output mode"""
+        chunk = next(iter_timeseries_chunks(10, freq='h', seed=1, as_frame=False))
+        
+        assert set(chunk) == {'date', 'value', 'category'}
+        assert chunk['date'].dtype == np.dtype('datetime64[ns]')
+        assert chunk['value'].shape == (10,)
+    
+    def test_matches_in_memory_generator(self):
+        """Test that generate_timeseries_data uses the same model"""
+        df = generate_timeseries_data(days=30, seed=9, end='2024-01-31')
+        streamed = pd.concat(iter_timeseries_chunks(31, freq='D', chunk_size=7, seed=9,
+                                                    end='2024-01-31'), ignore_index=True)
+        
+        pd.testing.assert_frame_equal(df, streamed)
+    
+    def test_non_fixed_frequency_rejected(self):
+        """Test that calendar frequencies are rejected"""
+        with pytest.raises(ValueError):
+            next(iter_timeseries_chunks(10, freq='MS'))
+    
+    def test_write_timeseries_csv(self):
+        """Test streaming CSV export"""
+        buffer = io.StringIO()
+        rows = write_timeseries_csv(buffer, 250, freq='s', chunk_size=100, seed=1)
+        
+        lines = buffer.getvalue().strip().split('\n')
+        assert rows == 250
+        assert lines[0] == 'date,value,category'
+        assert len(lines) == 251
+
+
+class TestMultiSeries:
+    """Test suite for vectorized multi-series generation"""
+    
+    def test_long_layout(self):
+        """Test long-form output shape and columns"""
+        df = generate_multi_series_data(n_series=4, periods=10, seed=1)
+        
+        assert list(df.columns) == ['date', 'series', 'value']
+        assert len(df) == 40
+        assert df['series'].nunique() == 4
+        assert (df.groupby('series', observed=True).size() == 10).all()
+    
+    def test_wide_and_array_layouts_agree(self):
+        """Test that wide frame and raw array hold the same values"""
+        wide = generate_multi_series_data(n_series=5, periods=20, seed=2, layout='wide')
+        values = generate_multi_series_data(n_series=5, periods=20, seed=2, layout='array')
+        
+        assert wide.shape == (20, 5)
+        assert values.shape == (5, 20)
+        assert np.allclose(wide.values.T, values)
+    
+    def test_long_matches_array(self):
+        """Test that long-form rows follow series-major order"""
+        long_df = generate_multi_series_data(n_series=3, periods=6, seed=3)
+        values = generate_multi_series_data(n_series=3, periods=6, seed=3, layout='array')
+        
+        assert np.allclose(long_df['value'].values, values.ravel())
+    
+    def test_series_are_independent(self):
+        """Test that series do not share the same values"""
+        values = generate_multi_series_data(n_series=2, periods=100, seed=4, layout='array')
+        
+        assert not np.allclose(values[0], values[1])
+    
+    def test_random_walk(self):
+        """Test random-walk mode output"""
+        values = generate_multi_series_data(n_series=3, periods=50, seed=5,
+                                            random_walk=True, layout='array')
+        
+        assert values.shape == (3, 50)
+        assert not np.isnan(values).any()
+    
+    def test_invalid_layout(self):
+        """Test that unknown layouts raise"""
+        with pytest.raises(ValueError):
+            generate_multi_series_data(layout='columns')
+    
+    @pytest.mark.slow
+    def test_benchmark_against_looped_generation(self):
+        """Benchmark batched generation against one call per series plus concat"""
+        n_series, days = 500, 365
+        
+        start = time.perf_counter()
+        frames = []
+        for i in range(n_series):
+            frame = generate_timeseries_data.uncached(days=days, seed=i)
+            frames.append(frame.assign(series=f'Series {i + 1}'))
+        looped = pd.concat(frames, ignore_index=True)
+        looped_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        batched = generate_multi_series_data.uncached(n_series=n_series, periods=days + 1, seed=0)
+        batched_time = time.perf_counter() - start
+        
+        print(f"\nlooped: {looped_time:.3f}s, batched: {batched_time:.3f}s, "
+              f"speedup: {looped_time / batched_time:.1f}x")
+        assert len(batched) == len(looped)
+        assert (batched['date'].to_numpy() == looped['date'].to_numpy()).all()
+        assert batched_time < looped_time
+
+
+def _failing_export(name, seed, scale):
+    """Stand-in for build_export_dataset that fails inside a worker"""
+    raise ValueError(f"cannot build {name}")
+
+
+class TestBulkExport:
+    """Test suite for parallel bulk dataset export"""
+    
+    def test_all_datasets_generated_with_timings(self):
+        """Test that every dataset is encoded and timed"""
+        results = generate_all_datasets(seed=1, parallel=False)
+        
+        assert set(results) == set(BULK_EXPORT_DATASETS)
+        for result in results.values():
+            assert isinstance(result['csv'], bytes)
+            assert result['rows'] > 0
+            assert result['seconds'] >= 0
+    
+    def test_parallel_matches_sequential(self):
+        """Test that per-dataset seeds do not depend on the worker pool"""
+        parallel = generate_all_datasets(seed=2, max_workers=2)
+        sequential = generate_all_datasets(seed=2, parallel=False)
+        
+        for name in BULK_EXPORT_DATASETS:
+            assert parallel[name]['csv'] == sequential[name]['csv']
+    
+    def test_worker_errors_propagate(self, monkeypatch):
+        """Test that a failing task raises instead of silently running in-process"""
+        monkeypatch.setattr('app.build_export_dataset', _failing_export)
+        
+        with pytest.raises(ValueError, match="cannot build"):
+            generate_all_datasets(seed=2, max_workers=2)
+    
+    def test_datasets_use_independent_seeds(self):
+        """Test that a different root seed changes the output"""
+        first = generate_all_datasets(seed=3, parallel=False)
+        second = generate_all_datasets(seed=4, parallel=False)
+        
+        assert first['scatter']['csv'] != second['scatter']['csv']
+    
+    def test_scale_multiplies_rows(self):
+        """Test the dataset size multiplier"""
+        results = generate_all_datasets(seed=1, scale=10, parallel=False)
+        
+        assert results['scatter']['rows'] == 5000
+        assert results['categorical']['rows'] == 5
+    
+    @pytest.mark.parametrize('scale', BULK_EXPORT_SCALES)
+    def test_every_offered_scale_generates(self, scale):
+        """Test that each size multiplier in the UI produces every dataset"""
+        for name in BULK_EXPORT_DATASETS:
+            data = generate_export_dataset(name, seed=1, scale=scale)
+            
+            assert len(data) > 0
+        
+        series = generate_export_dataset('time_series', seed=1, scale=scale)
+        assert len(series) == 365 * scale + 1
+        assert series['date'].iloc[-1] - series['date'].iloc[0] == pd.Timedelta(days=365)
+
+
+class TestRealtimeRingBuffer:
+    """Test suite for the ring buffer backed realtime stream"""
+    
+    def test_ring_buffer_keeps_newest_samples(self):
+        """Test that the buffer wraps around and keeps the newest values"""
+        buffer = RingBuffer(4, {'value': np.float64})
+        buffer.append(value=np.arange(3.0))
+        buffer.append(value=np.arange(3.0, 6.0))
+        
+        assert len(buffer) == 4
+        assert list(buffer.window()['value']) == [2.0, 3.0, 4.0, 5.0]
+        assert list(buffer.window(2)['value']) == [4.0, 5.0]
+    
+    def test_ring_buffer_window_is_view(self):
+        """Test that windows share memory with the buffer"""
+        buffer = RingBuffer(8, {'value': np.float64})
+        buffer.append(value=np.arange(20.0))
+        window = buffer.window(5)['value']
+        
+        assert window.base is not None
+        assert list(window) == [15.0, 16.0, 17.0, 18.0, 19.0]
+    
+    def test_ring_buffer_oversized_append(self):
+        """Test appending more samples than the capacity"""
+        buffer = RingBuffer(3, {'value': np.int64})
+        buffer.append(value=np.arange(10))
+        
+        assert list(buffer.window()['value']) == [7, 8, 9]
+        assert buffer.total_appended == 10
+    
+    def test_stream_continues_random_walk(self):
+        """Test that ticking continues the series instead of regenerating it"""
+        stream = RealtimeStream(seed=1, capacity=100, start='2024-01-01')
+        stream.tick(10)
+        before = stream.frame()['value'].copy()
+        stream.tick(5)
+        after = stream.frame()
+        
+        assert len(after) == 15
+        assert np.allclose(after['value'].iloc[:10], before)
+        assert (after['timestamp'].diff().dropna() == pd.Timedelta('1min')).all()
+    
+    def test_stream_matches_realtime_generator(self):
+        """Test that the stream follows the same model as generate_realtime_data"""
+        stream = RealtimeStream(seed=3, capacity=50)
+        stream.tick(50)
+        df = generate_realtime_data(n_points=50, seed=3)
+        
+        assert np.allclose(stream.frame()['value'], df['value'])
+    
+    def test_stream_frame_columns(self):
+        """Test that stream frames match the realtime data layout"""
+        stream = RealtimeStream(seed=2, capacity=20)
+        stream.tick(30)
+        frame = stream.frame(10)
+        
+        assert list(frame.columns) == ['timestamp', 'value', 'category', 'status']
+        assert len(frame) == 10
+        assert set(frame['category'].unique()) <= {'Sensor A', 'Sensor B', 'Sensor C'}
+        assert pd.api.types.is_datetime64_any_dtype(frame['timestamp'])
+    
+    def test_stream_frame_survives_ticks(self):
+        """Test that a frame is not overwritten when the ring wraps"""
+        stream = RealtimeStream(seed=5, capacity=20)
+        stream.tick(20)
+        frame = stream.frame()
+        expected = frame.copy()
+        stream.tick(20)
+        
+        pd.testing.assert_frame_equal(frame, expected)
+
+
+class TestLeanDtypes:
+    """Test suite for the compact dtype representation"""
+    
+    def test_lean_timeseries_dtypes(self):
+        """Test lean time series uses float32 and categorical labels"""
+        df = generate_timeseries_data(days=30, seed=1, lean=True)
+        
+        assert df['value'].dtype == np.float32
+        assert isinstance(df['category'].dtype, pd.CategoricalDtype)
+        assert list(df['category'].cat.categories) == ['A', 'B', 'C']
+    
+    def test_lean_values_match_standard(self):
+        """Test that lean data holds the same values at float32 precision"""
+        full = generate_scatter_data(n_points=200, seed=4)
+        lean = generate_scatter_data(n_points=200, seed=4, lean=True)
+        
+        assert np.allclose(full['x'], lean['x'], atol=1e-5)
+        assert (full['group'] == lean['group'].astype(object)).all()
+        assert lean['size'].dtype == np.int8
+    
+    def test_lean_label_columns_are_categorical(self):
+        """Test categorical and realtime label columns in lean mode"""
+        categorical = generate_categorical_data(seed=1, lean=True)
+        realtime = generate_realtime_data(n_points=20, seed=1, lean=True)
+        
+        assert isinstance(categorical['subcategory'].dtype, pd.CategoricalDtype)
+        assert categorical['value'].dtype == np.int16
+        assert isinstance(realtime['status'].dtype, pd.CategoricalDtype)
+    
+    def test_lean_chunks_concatenate_as_categorical(self):
+        """Test that lean chunks share one category set"""
+        chunks = iter_timeseries_chunks(100, freq='h', chunk_size=10, seed=1, lean=True)
+        df = pd.concat(chunks, ignore_index=True)
+        
+        assert isinstance(df['category'].dtype, pd.CategoricalDtype)
+    
+    def test_compact_dtypes_integer_downcast(self):
+        """Test integer downcasting picks the smallest fitting type"""
+        df = pd.DataFrame({'small': [1, 100], 'medium': [0, 30000], 'large': [0, 10**6]})
+        lean = compact_dtypes(df)
+        
+        assert lean['small'].dtype == np.int8
+        assert lean['medium'].dtype == np.int16
+        assert lean['large'].dtype == np.int32
+    
+    def test_memory_report(self):
+        """Test memory report totals before and after"""
+        report = memory_report(generate_timeseries_data(days=1000, seed=1))
+        
+        assert report.loc['total', 'lean bytes'] < report.loc['total', 'bytes']
+        assert report.loc['category', 'saving %'] > 50
+    
+    def test_filters_work_on_lean_data(self):
+        """Test that apply_filters handles categorical columns"""
+        df = generate_timeseries_data(days=60, seed=2, lean=True)
+        filters = {'min_value': 120, 'max_value': None, 'categories': ['A'], 'date_range': None}
+        
+        filtered_df = apply_filters(df, filters)
+        
+        assert (filtered_df['category'] == 'A').all()
+        assert filtered_df['value'].min() >= 120
+
+
+class TestCorrelationEngine:
+    """Test suite for the blocked correlation engine"""
+    
+    def setup_method(self):
+        get_dataset_cache().clear()
+    
+    def test_blocked_matches_numpy(self):
+        """Test blocked correlation against np.corrcoef"""
+        data = np.random.default_rng(0).standard_normal((1000, 12))
+        corr = blocked_correlation(data, block_rows=97)
+        
+        assert corr.dtype == np.float32
+        assert np.allclose(corr, np.corrcoef(data, rowvar=False), atol=1e-5)
+    
+    def test_streaming_blocks_match_in_memory(self):
+        """Test that a block factory gives the same result as the full array"""
+        full = np.vstack(list(iter_correlated_blocks(600, 20, seed=1, n_factors=2)))
+        streamed = blocked_correlation(
+            lambda: iter_correlated_blocks(600, 20, seed=1, n_factors=2, block_rows=50))
+        
+        assert np.allclose(streamed, blocked_correlation(full), atol=1e-5)
+    
+    def test_columns_are_prefix_stable(self):
+        """Test that a wider dataset starts with the narrower one's columns"""
+        narrow = np.vstack(list(iter_correlated_blocks(100, 10, seed=2)))
+        wide = np.vstack(list(iter_correlated_blocks(100, 150, seed=2)))
+        
+        assert np.array_equal(narrow, wide[:, :10])
+    
+    def test_smaller_size_slices_cached_matrix(self):
+        """Test that shrinking the variable count reuses the larger matrix"""
+        large = get_correlation_matrix(40, n_rows=200, seed=3)
+        small = get_correlation_matrix(15, n_rows=200, seed=3)
+        
+        assert np.shares_memory(large, small)
+        assert np.array_equal(small, large[:15, :15])
+    
+    def test_constant_column_gives_nan(self):
+        """Test that zero-variance columns produce NaN like pandas"""
+        data = np.column_stack([np.arange(10.0), np.ones(10)])
+        corr = blocked_correlation(data)
+        
+        assert np.isnan(corr[1, 1])
+        assert corr[0, 0] == 1
+    
+    def test_large_offset_keeps_precision(self):
+        """Test that a large common offset does not cancel the variances"""
+        data = np.random.default_rng(5).standard_normal((5000, 4))
+        data[:, 1] += 0.5 * data[:, 0]
+        corr = blocked_correlation(data + 1e8, block_rows=1000)
+        
+        assert np.allclose(corr, np.corrcoef(data, rowvar=False), atol=1e-4)
+    
+    def test_rows_are_capped(self):
+        """Test that observations beyond the cap reuse the capped matrix"""
+        capped = get_correlation_matrix(5, n_rows=CORRELATION_MAX_ROWS, seed=3)
+        
+        assert np.shares_memory(get_correlation_matrix(5, n_rows=10 * CORRELATION_MAX_ROWS,
+                                                       seed=3), capped)
+    
+    def test_heatmap_sizes_share_one_entry(self):
+        """Test that every heatmap size is served from one cached matrix"""
+        for size in (5, 10, 20, 8):
+            generate_heatmap_data(size=size, seed=3)
+        
+        assert len(get_dataset_cache()) == 1
+    
+    def test_top_correlations(self):
+        """Test strongest-pair extraction"""
+        corr = pd.DataFrame([[1, 0.2, -0.9], [0.2, 1, 0.5], [-0.9, 0.5, 1]],
+                            index=list('abc'), columns=list('abc'))
+        top = top_correlations(corr, k=2)
+        
+        assert list(top['variable 1']) == ['a', 'b']
+        assert list(top['variable 2']) == ['c', 'c']
+        assert np.isclose(top['correlation'].iloc[0], -0.9)
+    
+    def test_cluster_order_groups_correlated_variables(self):
+        """Test that clustering places correlated blocks next to each other"""
+        rng = np.random.default_rng(4)
+        base = rng.standard_normal((500, 2))
+        # Interleave two groups of variables: even columns follow factor 0, odd factor 1
+        data = base[:, np.arange(8) % 2] + 0.3 * rng.standard_normal((500, 8))
+        order = cluster_order(blocked_correlation(data))
+        
+        assert sorted(order) == list(range(8))
+        groups = order % 2
+        assert (groups[:4] == groups[0]).all() and (groups[4:] == groups[4]).all()
+
+
+class TestWaveEngine:
+    """Test suite for the broadcasted multi-wave engine"""
+    
+    def test_wave_matrix_matches_single_waves(self):
+        """Test that each row equals the corresponding single sine wave"""
+        x = np.linspace(0, 4 * np.pi, 200)
+        y = wave_matrix(x, [1, 2], [1, 0.5], [0, np.pi / 4])
+        
+        assert y.shape == (2, 200)
+        assert np.allclose(y[1], 0.5 * np.sin(2 * x + np.pi / 4))
+    
+    def test_long_form_output(self):
+        """Test long-form multi-wave output without concat"""
+        df = generate_wave_data([(1, 1, 0), (2, 0.5, 0), (3, 0.3, 0)], points=100)
+        
+        assert len(df) == 300
+        assert list(df['wave'].cat.categories) == [
+            'Wave 1 (f=1, A=1)', 'Wave 2 (f=2, A=0.5)', 'Wave 3 (f=3, A=0.3)']
+        single = generate_sine_data(frequency=2, amplitude=0.5, points=100)
+        assert np.allclose(df[df['wave'] == 'Wave 2 (f=2, A=0.5)']['y'].values, single['y'])
+    
+    def test_superposition(self):
+        """Test that superposed output is the sum of the waves"""
+        waves = [(1, 1, 0), (2, 0.5, 1)]
+        total = generate_wave_data(waves, points=50, superpose=True)
+        parts = generate_wave_data(waves, points=50)
+        
+        assert np.allclose(total['y'].values,
+                           parts.groupby('x', sort=False)['y'].sum().values)
+    
+    def test_square_wave_with_many_harmonics(self):
+        """Test that hundreds of harmonics converge towards a square wave"""
+        df = generate_wave_data(square_wave_harmonics(300), points=1000, superpose=True)
+        
+        quarter = df['y'].iloc[len(df) // 8]  # x = pi / 2
+        assert abs(quarter - 1) < 0.05
+    
+    def test_surface_grid_is_cached(self):
+        """Test that the surface grid is reused per resolution"""
+        first = generate_wave_surface(resolution=60)
+        second = generate_wave_surface(resolution=60)
+        x, y, z = first
+        
+        assert first is second
+        assert z.shape == (60, 60)
+        assert np.isclose(z[30, 30], np.sin(np.hypot(x[30], y[30])))
+
+
+class TestPrerenderedWaveFrames:
+    """Test suite for client-side wave animation frames"""
+    
+    @staticmethod
+    def _wave_app():
+        import streamlit as st
+        from app import show_wave_patterns
+        
+        st.session_state.setdefault('dark_mode', False)
+        show_wave_patterns()
+    
+    def test_sliders_follow_shared_ranges(self):
+        """Test that the page sliders are built from WAVE_SLIDER_RANGES"""
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_function(self._wave_app).run(timeout=30)
+        sliders = {slider.label.lower(): slider for slider in at.slider}
+        
+        for name, (low, high, step) in WAVE_SLIDER_RANGES.items():
+            assert (sliders[name].min, sliders[name].max, sliders[name].step) == (low, high, step)
+    
+    def test_plan_respects_budget(self):
+        """Test that frame and point counts stay within the value budget"""
+        for requested in (5, 64, 1000, 100000):
+            frames, points = plan_frame_grid(requested, value_budget=50_000)
+            assert frames * points <= 50_000
+            assert 100 <= points <= 1000
+    
+    def test_plan_keeps_small_grids_at_full_resolution(self):
+        """Test that few frames get the maximum point count"""
+        assert plan_frame_grid(10) == (10, 1000)
+    
+    def test_animation_frames_match_waves(self):
+        """Test that each frame equals the wave at its swept parameter"""
+        fig = build_wave_animation(sweep='phase', frequency=2.0, amplitude=1.5)
+        x = np.asarray(fig.data[0].x, dtype=np.float64)
+        last = np.asarray(fig.frames[-1].data[0].y, dtype=np.float64)
+        
+        assert np.allclose(last, 1.5 * np.sin(2.0 * x + 2 * np.pi), atol=1e-4)
+        assert len(fig.layout.sliders[0].steps) == len(fig.frames)
+    
+    def test_animation_payload_is_bounded(self):
+        """Test that total shipped values stay within the budget"""
+        for sweep in ('phase', 'frequency', 'amplitude'):
+            fig = build_wave_animation(sweep=sweep)
+            n_values = sum(len(frame.data[0].y) for frame in fig.frames)
+            assert n_values <= PRERENDER_VALUE_BUDGET
+
+
+def _copying_apply_filters(df, filters):
+    """Reference implementation that copies once per active filter"""
+    filtered_df = df.copy()
+    if filters.get('min_value') is not None:
+        filtered_df = filtered_df[filtered_df['value'] >= filters['min_value']]
+    if filters.get('max_value') is not None:
+        filtered_df = filtered_df[filtered_df['value'] <= filters['max_value']]
+    if filters.get('categories'):
+        filtered_df = filtered_df[filtered_df['category'].isin(filters['categories'])]
+    if filters.get('date_range'):
+        start_date, end_date = filters['date_range']
+        filtered_df = filtered_df[(filtered_df['date'] >= start_date) &
+                                  (filtered_df['date'] <= end_date)]
+    return filtered_df
+
+
+class TestFusedFilters:
+    """Test suite for the single-pass filter engine"""
+    
+    def test_no_filters_returns_input_without_copy(self):
+        """Test that inactive filters return the same frame"""
+        df = generate_timeseries_data(days=30, seed=1)
+        filters = {'min_value': None, 'max_value': None, 'categories': [], 'date_range': None}
+        
+        assert apply_filters(df, filters) is df
+        assert filter_mask(df, filters) is None
+    
+    def test_all_rows_kept_returns_input(self):
+        """Test that filters passing every row avoid materialization"""
+        df = generate_timeseries_data(days=30, seed=1)
+        filters = {'min_value': -1e9, 'max_value': 1e9, 'categories': [], 'date_range': None}
+        
+        assert apply_filters(df, filters) is df
+    
+    def test_fused_filters_match_reference(self):
+        """Test that all predicates combined match the copying implementation"""
+        df = generate_timeseries_data(days=365, seed=2)
+        filters = {
+            'min_value': 120,
+            'max_value': 180,
+            'categories': ['A', 'C'],
+            'date_range': (df['date'].iloc[50], df['date'].iloc[300]),
+        }
+        
+        pd.testing.assert_frame_equal(apply_filters(df, filters),
+                                      _copying_apply_filters(df, filters))
+    
+    def test_date_range_filter(self):
+        """Test date range filtering"""
+        df = generate_timeseries_data(days=100, seed=3)
+        start, end = df['date'].iloc[10], df['date'].iloc[20]
+        filters = {'min_value': None, 'max_value': None, 'categories': [],
+                   'date_range': (start, end)}
+        
+        filtered_df = apply_filters(df, filters)
+        
+        assert len(filtered_df) == 11
+        assert filtered_df['date'].min() == start
+    
+    def test_date_range_on_sorted_data_is_zero_copy(self):
+        """Test that a date range alone returns a view of sorted data"""
+        df = generate_timeseries_data(days=100, seed=3)
+        filters = {'min_value': None, 'max_value': None, 'categories': [],
+                   'date_range': (df['date'].iloc[10], df['date'].iloc[20])}
+        
+        filtered_df = apply_filters(df, filters)
+        
+        assert len(filtered_df) == 11
+        assert np.shares_memory(filtered_df['value'].to_numpy(), df['value'].to_numpy())
+    
+    @pytest.mark.slow
+    @pytest.mark.parametrize('n_rows', [10**5, 10**6, 10**7])
+    def test_benchmark_fused_filters(self, n_rows):
+        """Benchmark fused filtering against one copy per filter"""
+        df = pd.concat(iter_timeseries_chunks(n_rows, freq='s', chunk_size=10**6,
+                                              seed=1, lean=True), ignore_index=True)
+        filters = {
+            'min_value': 110,
+            'max_value': 190,
+            'categories': ['A', 'B'],
+            'date_range': (df['date'].iloc[n_rows // 10], df['date'].iloc[-n_rows // 10]),
+        }
+        
+        start = time.perf_counter()
+        reference = _copying_apply_filters(df, filters)
+        copying_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        fused = apply_filters(df, filters)
+        fused_time = time.perf_counter() - start
+        
+        print(f"\n{n_rows:>10,} rows  copying: {copying_time:.3f}s  fused: {fused_time:.3f}s  "
+              f"speedup: {copying_time / fused_time:.1f}x")
+        assert len(fused) == len(reference)
+        assert (fused['value'].to_numpy() == reference['value'].to_numpy()).all()
+
+
+class TestTimeIndex:
+    """Test suite for binary-search time range selection"""
+    
+    def test_generated_frames_are_marked_sorted(self):
+        """Test that generators record their sorted time column"""
+        assert is_time_sorted(generate_timeseries_data(days=10, seed=1), 'date')
+        assert is_time_sorted(generate_realtime_data(n_points=10, seed=1), 'timestamp')
+    
+    def test_time_bounds_inclusive(self):
+        """Test that both ends of the range are inclusive"""
+        df = generate_timeseries_data(days=30, seed=1, end='2024-01-31')
+        
+        assert time_bounds(df, '2024-01-05', '2024-01-10') == (4, 10)
+        assert time_bounds(df, '2023-01-01', '2023-02-01') == (0, 0)
+    
+    def test_time_slice_between_timestamps(self):
+        """Test range selection between sample times"""
+        df = generate_realtime_data(n_points=60, seed=1, end='2024-01-01 01:00')
+        sliced = time_slice(df, '2024-01-01 00:30:30', '2024-01-01 00:40:00')
+        
+        assert sliced['timestamp'].iloc[0] == pd.Timestamp('2024-01-01 00:31')
+        assert sliced['timestamp'].iloc[-1] == pd.Timestamp('2024-01-01 00:40')
+    
+    def test_reordered_frame_falls_back_to_mask(self):
+        """Test that a sort_values result of a marked frame is not trusted as sorted"""
+        df = generate_timeseries_data(days=30, seed=1, end='2024-01-31')
+        by_value = df.sort_values('value')
+        filters = {'min_value': None, 'max_value': None, 'categories': [],
+                   'date_range': (pd.Timestamp('2024-01-05'), pd.Timestamp('2024-01-10'))}
+        
+        assert time_bounds(by_value, '2024-01-05', '2024-01-10') is None
+        assert len(time_slice(by_value, '2024-01-05', '2024-01-10')) == 6
+        assert len(apply_filters(by_value, filters)) == 6
+    
+    def test_concatenated_frame_falls_back_to_mask(self):
+        """Test that concatenating marked frames does not carry the sorted mark"""
+        df = generate_timeseries_data(days=30, seed=1, end='2024-01-31')
+        doubled = pd.concat([df, df])
+        filters = {'min_value': None, 'max_value': None, 'categories': [],
+                   'date_range': (pd.Timestamp('2024-01-05'), pd.Timestamp('2024-01-10'))}
+        
+        assert not is_time_sorted(doubled, 'date')
+        assert len(apply_filters(doubled, filters)) == 12
+    
+    def test_date_range_filter_covers_timestamp_column(self):
+        """Test that the date_range filter applies to realtime timestamps"""
+        df = generate_realtime_data(n_points=60, seed=1, end='2024-01-01 01:00')
+        filters = {'min_value': None, 'max_value': None, 'categories': [],
+                   'date_range': (pd.Timestamp('2024-01-01 00:10'),
+                                  pd.Timestamp('2024-01-01 00:19'))}
+        
+        assert len(apply_filters(df, filters)) == 10
+    
+    def test_sorted_and_mask_paths_agree(self):
+        """Test that binary search matches elementwise comparison"""
+        df = generate_timeseries_data(days=200, seed=5)
+        filters = {'min_value': 130, 'max_value': None, 'categories': ['B'],
+                   'date_range': (df['date'].iloc[20], df['date'].iloc[150])}
+        unmarked = df.copy()
+        
+        pd.testing.assert_frame_equal(apply_filters(df, filters),
+                                      _copying_apply_filters(df, filters))
+        assert filter_mask(df, filters).tolist() == filter_mask(unmarked, filters).tolist()
+
+
+class TestFilterCache:
+    """Test suite for memoized filter results"""
+    
+    def setup_method(self):
+        get_dataset_cache().clear()
+        get_filter_cache().clear()
+    
+    def test_repeated_filters_hit_cache(self):
+        """Test that unchanged data and filters reuse the stored result"""
+        df = generate_timeseries_data(days=60, seed=1)
+        filters = {'min_value': 130, 'max_value': None, 'categories': [], 'date_range': None}
+        
+        first = cached_apply_filters(df, filters)
+        second = cached_apply_filters(df, dict(filters))
+        
+        assert first is second
+        assert get_filter_cache().stats()['hits'] == 1
+    
+    def test_inactive_filters_skip_cache(self):
+        """Test that no active filters returns the input untouched"""
+        df = generate_timeseries_data(days=60, seed=1)
+        filters = {'min_value': None, 'max_value': None, 'categories': [], 'date_range': None}
+        
+        assert cached_apply_filters(df, filters) is df
+        assert len(get_filter_cache()) == 0
+    
+    def test_normalize_filters(self):
+        """Test canonical filter keys"""
+        first = normalize_filters({'min_value': 1, 'categories': ['B', 'A']})
+        second = normalize_filters({'min_value': 1.0, 'max_value': None,
+                                    'categories': ['A', 'B'], 'date_range': None})
+        
+        assert first == second
+        assert normalize_filters({'min_value': 1}, generate_distribution_data(seed=1)) == ()
+    
+    def test_fingerprint_distinguishes_datasets(self):
+        """Test that different data gives different fingerprints"""
+        first = generate_timeseries_data(days=60, seed=1)
+        second = generate_timeseries_data(days=60, seed=2)
+        
+        assert dataset_fingerprint(first) != dataset_fingerprint(second)
+        assert dataset_fingerprint(first) == dataset_fingerprint(first)
+    
+    def test_unregistered_frames_are_not_cached(self):
+        """Test that ad-hoc frames have no fingerprint and bypass the filter cache"""
+        df = pd.DataFrame({'value': np.arange(10_000.0)})
+        changed = df.copy()
+        changed.loc[4_321, 'value'] = -1.0
+        filters = {'min_value': None, 'max_value': 0.5, 'categories': [], 'date_range': None}
+        
+        assert dataset_fingerprint(df) is None
+        assert len(cached_apply_filters(df, filters)) == 1
+        assert len(cached_apply_filters(changed, filters)) == 2
+        assert len(get_filter_cache()) == 0
+    
+    def test_derived_frames_are_registered(self):
+        """Test that filter results, time slices and stream frames carry fingerprints"""
+        df = generate_timeseries_data(days=60, seed=1, end='2024-03-01')
+        filters = {'min_value': 120, 'max_value': None, 'categories': [], 'date_range': None}
+        filtered = cached_apply_filters(df, filters)
+        sliced = time_slice(df, '2024-01-10', '2024-01-20')
+        stream = RealtimeStream(seed=1, capacity=50, start='2024-01-01')
+        stream.tick(20)
+        before = stream.frame(10)
+        stream.tick(1)
+        
+        assert dataset_fingerprint(filtered) is not None
+        assert dataset_fingerprint(sliced) == dataset_fingerprint(
+            time_slice(df, '2024-01-10', '2024-01-20'))
+        assert dataset_fingerprint(before) != dataset_fingerprint(stream.frame(10))
+    
+    def test_invalidate_only_matching_filter_state(self):
+        """Test that clearing one filter state keeps other results"""
+        df = generate_timeseries_data(days=60, seed=1)
+        active = {'min_value': 130, 'max_value': 170, 'categories': [], 'date_range': None}
+        other = {'min_value': None, 'max_value': None, 'categories': ['A'], 'date_range': None}
+        cached_apply_filters(df, active)
+        cached_apply_filters(df, other)
+        
+        assert invalidate_filter_results(active) == 1
+        assert len(get_filter_cache()) == 1
+
+
+class TestCategoryIndex:
+    """Test suite for the category position index"""
+    
+    def test_positions_per_label(self):
+        """Test that positions are sorted and complete"""
+        index = CategoryIndex(pd.Series(['b', 'a', 'b', 'c', 'a', 'b']))
+        
+        assert list(index.positions('b')) == [0, 2, 5]
+        assert list(index.positions('a')) == [1, 4]
+        assert len(index.positions('missing')) == 0
+        assert index.counts() == {'b': 3, 'a': 2, 'c': 1}
+    
+    def test_mask_matches_isin(self):
+        """Test multi-category selection against Series.isin"""
+        df = generate_realtime_data(n_points=500, seed=1)
+        index = CategoryIndex(df['category'])
+        selected = ['Sensor A', 'Sensor C']
+        
+        assert np.array_equal(index.mask(selected), df['category'].isin(selected).to_numpy())
+    
+    def test_missing_values_are_skipped(self):
+        """Test that missing labels never match"""
+        index = CategoryIndex(pd.Series(['a', None, 'a']))
+        
+        assert list(index.mask(['a'])) == [True, False, True]
+    
+    def test_high_cardinality_labels(self):
+        """Test the index on thousands of series labels"""
+        df = generate_multi_series_data(n_series=2000, periods=5, seed=1)
+        index = CategoryIndex(df['series'])
+        
+        assert len(index.labels) == 2000
+        assert list(index.positions('Series 1000')) == list(range(4995, 5000))
+    
+    def test_index_built_once_per_dataset(self):
+        """Test that the index is reused for the same cached dataset"""
+        df = generate_timeseries_data(days=100, seed=11)
+        
+        assert get_category_index(df) is get_category_index(df)
+    
+    def test_filters_use_index_for_cached_datasets(self):
+        """Test category filtering through the index"""
+        df = generate_timeseries_data(days=100, seed=12)
+        filters = {'min_value': None, 'max_value': None, 'categories': ['A', 'B'],
+                   'date_range': None}
+        
+        pd.testing.assert_frame_equal(apply_filters(df, filters),
+                                      _copying_apply_filters(df, filters))
+
+
+class TestComparisonMode:
+    """Test suite for comparison mode built from one dataset"""
+    
+    def test_summary_reports_removed_rows_and_changes(self):
+        """Test the filtered vs unfiltered diff summary"""
+        values = np.array([1.0, 2.0, 3.0, 4.0])
+        summary = comparison_summary(values, np.array([False, True, True, True]))
+        
+        assert summary['rows_removed'] == 1
+        assert summary['mean_change'] == pytest.approx(0.5)
+        assert summary['std_change'] == pytest.approx(1.0 - values.std(ddof=1))
+    
+    def test_summary_without_mask(self):
+        """Test that no mask means no change"""
+        summary = comparison_summary(np.arange(10.0), None)
+        
+        assert summary['rows_removed'] == 0
+        assert summary['mean_change'] == 0
+    
+    def test_cached_mask_reused(self):
+        """Test that the comparison mask is computed once"""
+        get_filter_cache().clear()
+        df = generate_timeseries_data(days=60, seed=1)
+        filters = {'min_value': 140, 'max_value': None, 'categories': [], 'date_range': None}
+        
+        assert cached_filter_mask(df, filters) is cached_filter_mask(df, filters)
+        assert cached_filter_mask(df, {'min_value': None}) is None
+    
+    def test_panes_share_x_values(self):
+        """Test that both panes plot the same dates from one dataset"""
+        df = generate_timeseries_data(days=60, seed=1)
+        mask = df['value'].to_numpy() > 140
+        fig = build_comparison_figure(df, mask)
+        filtered, full = fig.data
+        
+        assert np.array_equal(filtered.x, full.x)
+        assert np.isnan(np.asarray(filtered.y, dtype=float)[~mask]).all()
+        assert np.allclose(np.asarray(full.y, dtype=float), df['value'])
+    
+    def test_panes_by_category(self):
+        """Test one trace per category and pane"""
+        df = generate_timeseries_data(days=60, seed=1)
+        fig = build_comparison_figure(df, None, color='category')
+        
+        assert len(fig.data) == 2 * df['category'].nunique()
+        assert sum(len(trace.x) for trace in fig.data) == 2 * len(df)
+
+
+class TestLTTB:
+    """Test suite for LTTB downsampling of line and area charts"""
+    
+    def test_keeps_endpoints_and_budget(self):
+        """Test that the output has n_out sorted positions including both ends"""
+        rng = np.random.default_rng(0)
+        y = np.cumsum(rng.standard_normal(10_000))
+        kept = lttb_indices(np.arange(10_000), y, 500)
+        
+        assert len(kept) == 500
+        assert kept[0] == 0 and kept[-1] == 9_999
+        assert np.all(np.diff(kept) > 0)
+    
+    def test_small_input_returned_whole(self):
+        """Test that series within budget are not reduced"""
+        assert np.array_equal(lttb_indices(np.arange(10), np.arange(10), 50), np.arange(10))
+    
+    def test_preserves_spikes(self):
+        """Test that isolated extremes survive downsampling"""
+        y = np.zeros(5_000)
+        y[[1_234, 3_777]] = [50.0, -80.0]
+        kept = lttb_indices(np.arange(5_000), y, 100)
+        
+        assert 1_234 in kept
+        assert 3_777 in kept
+    
+    def test_datetime_and_nan_values(self):
+        """Test that datetime x values and missing y values are handled"""
+        x = pd.date_range('2024-01-01', periods=1_000, freq='min').to_numpy()
+        y = np.sin(np.arange(1_000) / 20.0)
+        y[::7] = np.nan
+        kept = lttb_indices(x, y, 100)
+        
+        assert len(kept) == 100
+        assert not np.isnan(y[kept[1:-1]]).any()
+    
+    def test_per_category_budget(self):
+        """Test that every category keeps its own line within the budget"""
+        df = generate_wave_data([(1, 1, 0), (2, 0.5, 0), (3, 0.3, 0)], points=5_000)
+        rows = downsample_positions(df, 'x', 'y', 300, color='wave')
+        counts = df['wave'].iloc[rows].value_counts()
+        
+        assert len(rows) <= 300
+        assert set(counts.index) == set(df['wave'].unique())
+        assert (counts >= 99).all()
+    
+    def test_frame_within_budget_is_not_copied(self):
+        """Test that small frames are passed through unchanged"""
+        df = generate_sine_data(points=100)
+        
+        assert downsample_frame(df, 'x', 'y', budget=1_000) is df
+        assert len(downsample_frame(df, 'x', 'y', budget=20)) == 20
+    
+    def test_zoom_rebins_visible_window(self):
+        """Test that a zoomed window is downsampled from its own rows"""
+        df = generate_timeseries_data(days=730, seed=3)
+        start, end = df['date'].iloc[100], df['date'].iloc[299]
+        visible = time_positions(df, start, end)
+        window = df.iloc[visible]
+        rendered = downsample_frame(window, 'date', 'value', budget=50)
+        
+        assert visible == slice(100, 300)
+        assert len(rendered) == 50
+        assert rendered['date'].iloc[0] == start
+        assert rendered['date'].iloc[-1] == end
+
+
+class TestWebGLScatter:
+    """Test suite for the WebGL scatter rendering policy"""
+    
+    def test_render_mode_threshold(self):
+        """Test that WebGL is used only above the threshold"""
+        assert scatter_render_mode(1000, threshold=1000) == 'svg'
+        assert scatter_render_mode(1001, threshold=1000) == 'webgl'
+    
+    def test_webgl_keeps_groups_size_and_hover(self):
+        """Test that both paths encode the same groups, sizes and hover data"""
+        df = generate_scatter_data(n_points=3000, seed=4)
+        options = dict(x='x', y='y', color='group', size='size', hover_data=['size'])
+        svg = build_scatter_figure(df, render_mode='svg', **options)
+        webgl = build_scatter_figure(df, render_mode='webgl', **options)
+        
+        assert {type(trace).__name__ for trace in svg.data} == {'Scatter'}
+        assert {type(trace).__name__ for trace in webgl.data} == {'Scattergl'}
+        assert [trace.name for trace in webgl.data] == [trace.name for trace in svg.data]
+        for gl_trace, svg_trace in zip(webgl.data, svg.data):
+            assert np.array_equal(gl_trace.marker.size, svg_trace.marker.size)
+            assert np.array_equal(gl_trace.customdata, svg_trace.customdata)
+            assert gl_trace.hovertemplate == svg_trace.hovertemplate
+    
+    def test_render_costs_cover_both_paths(self):
+        """Test that build time and payload are measured for SVG and WebGL"""
+        df = generate_scatter_data(n_points=2000, seed=4)
+        costs = scatter_render_costs(df, x='x', y='y', color='group', size='size')
+        
+        assert list(costs.index) == ['svg', 'webgl']
+        assert list(costs['trace']) == ['Scatter', 'Scattergl']
+        assert (costs[['build_ms', 'serialize_ms', 'payload_kb']] > 0).all().all()
+
+
+class TestDensityRendering:
+    """Test suite for server-side density rendering of scatter data"""
+    
+    def test_grid_matches_histogram2d(self):
+        """Test that chunked binning agrees with np.histogram2d"""
+        rng = np.random.default_rng(0)
+        x, y = rng.standard_normal(50_000), rng.standard_normal(50_000)
+        counts = density_grid(x, y, (-2, 2), (-3, 3), bins=40, chunk_rows=7_000)
+        expected, _, _ = np.histogram2d(y, x, bins=40, range=[(-3, 3), (-2, 2)])
+        
+        assert counts.shape == (1, 40, 40)
+        assert np.array_equal(counts[0], expected)
+    
+    def test_group_channels(self):
+        """Test that each group is counted in its own channel"""
+        x = np.array([0.1, 0.1, 0.9])
+        y = np.array([0.1, 0.1, 0.9])
+        counts = density_grid(x, y, (0, 1), (0, 1), bins=2,
+                              groups=np.array([0, 1, 1]), n_groups=2)
+        
+        assert counts[0, 0, 0] == 1
+        assert counts[1, 0, 0] == 1
+        assert counts[1, 1, 1] == 1
+        assert counts.sum() == 3
+    
+    def test_zero_width_ranges(self):
+        """Test that collapsed slider ranges and constant columns are binned, not divided by zero"""
+        x = np.array([1.0, 1.0, 2.0])
+        y = np.array([0.5, 0.5, 0.5])
+        counts = density_grid(x, y, (1.0, 1.0), (0.0, 1.0), bins=4)
+        fig, constant = build_density_figure(pd.DataFrame({'x': x, 'y': y}), bins=4)
+        
+        assert counts.sum() == 2
+        assert constant.sum() == 3
+        assert fig.layout.yaxis.range[0] < 0.5 < fig.layout.yaxis.range[1]
+    
+    def test_image_is_transparent_where_empty(self):
+        """Test that empty cells are transparent and mixed cells blend group colors"""
+        counts = np.zeros((2, 2, 2), dtype=np.int64)
+        counts[0, 0, 0] = counts[1, 0, 0] = 5
+        rgba = density_image(counts, colors=[(255, 0, 0), (0, 0, 255)])
+        
+        assert rgba.shape == (2, 2, 4)
+        assert rgba[0, 0, 3] == 255
+        assert rgba[1, 1, 3] == 0
+        assert tuple(rgba[0, 0, :3]) == (128, 0, 128)
+    
+    def test_zoom_rebins_visible_region(self):
+        """Test that a zoomed figure counts only points in view at full resolution"""
+        df = generate_scatter_data(n_points=100_000, seed=2, lean=True)
+        _, full = build_density_figure(df, color='group', bins=50)
+        fig, zoomed = build_density_figure(df, color='group', x_range=(0, 1),
+                                           y_range=(0, 2), bins=50)
+        in_view = df['x'].between(0, 1) & df['y'].between(0, 2)
+        
+        assert full.sum() == len(df)
+        assert zoomed.sum() == in_view.sum()
+        assert zoomed.shape == (3, 50, 50)
+        assert len(fig.layout.images) == 1
+        assert len(fig.to_json()) < 200_000
+    
+    def test_streaming_pearson_matches_numpy(self):
+        """Test the one-pass correlation against np.corrcoef"""
+        df = generate_scatter_data(n_points=120_001, seed=5)
+        x, y = df['x'].to_numpy(), df['y'].to_numpy()
+        
+        assert streaming_pearson(x, y, block_rows=10_000) == pytest.approx(np.corrcoef(x, y)[0, 1])
+        assert np.isnan(streaming_pearson(np.ones(10), np.arange(10.0)))
+    
+    def test_lean_scatter_matches_default(self):
+        """Test that the lean scatter data holds the same values as the default"""
+        df = generate_scatter_data(n_points=1_000, seed=9)
+        lean = generate_scatter_data(n_points=1_000, seed=9, lean=True)
+        
+        assert list(lean['group'].astype(str)) == list(df['group'])
+        assert np.allclose(lean['y'], df['y'], atol=1e-5)
+
+
+class TestStratifiedSampling:
+    """Test suite for the stratified sampling renderer"""
+    
+    def test_budget_and_group_proportions(self):
+        """Test that the sample fits the budget and keeps group shares"""
+        df = generate_scatter_data(n_points=100_000, seed=6)
+        df = df.assign(group=np.where(np.arange(len(df)) < 10_000, 'Rare', df['group']))
+        positions, outliers = stratified_sample_positions(df, 1_000, group='group', seed=1)
+        drawn = np.setdiff1d(positions, outliers)
+        shares = df['group'].iloc[drawn].value_counts(normalize=True)
+        
+        assert len(positions) <= 1_000
+        assert np.all(np.diff(positions) > 0)
+        assert shares['Rare'] == pytest.approx(0.1, abs=0.01)
+    
+    def test_outliers_always_included(self):
+        """Test that the extremes of every column are in the sample"""
+        df = generate_scatter_data(n_points=50_000, seed=6)
+        positions, outliers = stratified_sample_positions(df, 500, group='group', seed=1)
+        
+        for column in ('x', 'y'):
+            assert df[column].to_numpy().argmax() in positions
+            assert df[column].to_numpy().argmin() in positions
+        assert len(outliers) == 25
+        assert np.isin(outliers, positions).all()
+    
+    def test_reproducible_by_seed(self):
+        """Test that the same seed draws the same sample"""
+        df = generate_scatter_data(n_points=20_000, seed=6)
+        first, _ = stratified_sample_positions(df, 800, group='group', seed=3)
+        again, _ = stratified_sample_positions(df, 800, group='group', seed=3)
+        other, _ = stratified_sample_positions(df, 800, group='group', seed=4)
+        
+        assert np.array_equal(first, again)
+        assert not np.array_equal(first, other)
+    
+    def test_small_frames_are_kept_whole(self):
+        """Test that frames within budget are not sampled"""
+        df = generate_scatter_data(n_points=100, seed=6)
+        positions, outliers = stratified_sample_positions(df, 500)
+        
+        assert np.array_equal(positions, np.arange(100))
+        assert len(outliers) == 0
+    
+    def test_correlation_estimate_covers_full_data(self):
+        """Test that the interval of a random sample contains the full-data correlation"""
+        df = generate_scatter_data(n_points=200_000, seed=8)
+        positions, outliers = stratified_sample_positions(df, 2_000, group='group', seed=2)
+        drawn = np.setdiff1d(positions, outliers)
+        estimate = correlation_estimate(df['x'].to_numpy()[drawn], df['y'].to_numpy()[drawn],
+                                        n_population=len(df))
+        full = np.corrcoef(df['x'], df['y'])[0, 1]
+        
+        assert estimate['low'] <= full <= estimate['high']
+        assert 0 < estimate['error'] < 0.01
+    
+    def test_correlation_estimate_without_error_on_full_data(self):
+        """Test that the finite population correction removes the error for a census"""
+        df = generate_scatter_data(n_points=1_000, seed=8)
+        estimate = correlation_estimate(df['x'].to_numpy(), df['y'].to_numpy(),
+                                        n_population=len(df))
+        
+        assert estimate['error'] == pytest.approx(0)
+    
+    def test_cached_positions_reuse_the_draw(self):
+        """Test that a registered frame is sampled once per budget and seed"""
+        get_filter_cache().clear()
+        df = generate_scatter_data(n_points=20_000, seed=6)
+        first = cached_sample_positions(df, 800, group='group', seed=3)
+        again = cached_sample_positions(df, 800, group='group', seed=3)
+        expected, _ = stratified_sample_positions(df, 800, group='group', seed=3)
+        
+        assert again is first
+        assert np.array_equal(first[0], expected)
+
+
+class TestFigureCache:
+    """Test suite for the serialized figure cache"""
+    
+    def setup_method(self):
+        get_figure_cache().clear()
+    
+    def test_reruns_reuse_stored_figure(self):
+        """Test that the figure is built once per data, options and template"""
+        df = generate_timeseries_data(days=60, seed=1)
+        calls = []
+        
+        def build():
+            calls.append(1)
+            return px.line(df, x='date', y='value').update_layout(height=300)
+        
+        first = cached_figure(df, build, 'line', 'plotly_white', show_category=False)
+        again = cached_figure(df, build, 'line', 'plotly_white', show_category=False)
+        
+        assert len(calls) == 1
+        assert again is not first
+        assert again.layout.height == 300
+        assert json.loads(again.to_json()) == json.loads(first.to_json())
+    
+    def test_key_covers_data_and_options(self):
+        """Test that changing data or an option rebuilds the figure"""
+        df = generate_timeseries_data(days=60, seed=1)
+        other = generate_timeseries_data(days=60, seed=2)
+        calls = []
+        
+        def build():
+            calls.append(1)
+            return px.line(df, x='date', y='value')
+        
+        cached_figure(df, build, 'line', 'plotly_white', show_category=False)
+        cached_figure(df, build, 'line', 'plotly_white', show_category=True)
+        cached_figure(other, build, 'line', 'plotly_white', show_category=False)
+        cached_figure(df, build, 'area', 'plotly_white', show_category=False)
+        
+        assert len(calls) == 4
+    
+    def test_theme_change_only_retemplates(self):
+        """Test that switching the template restyles the stored figure without a rebuild"""
+        df = generate_timeseries_data(days=60, seed=1)
+        calls = []
+        
+        def build():
+            calls.append(1)
+            return px.line(df, x='date', y='value').update_layout(height=300)
+        
+        light = cached_figure(df, build, 'line', 'plotly_white')
+        dark = cached_figure(df, build, 'line', 'plotly_dark')
+        light_layout = json.loads(light.to_json())['layout']
+        dark_layout = json.loads(dark.to_json())['layout']
+        
+        assert len(calls) == 1
+        assert light_layout['template']['layout']['paper_bgcolor'] == 'white'
+        assert dark_layout['template']['layout']['paper_bgcolor'] == 'rgb(17,17,17)'
+        assert dark_layout['height'] == light_layout['height'] == 300
+        assert json.loads(dark.to_json())['data'] == json.loads(light.to_json())['data']
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used figure is evicted first"""
+        cache = get_figure_cache()
+        df = generate_timeseries_data(days=30, seed=1)
+        for nbins in range(cache.max_entries + 1):
+            cached_figure(df, lambda: px.histogram(df, x='value', nbins=nbins + 1),
+                          'histogram', 'plotly_white', nbins=nbins)
+        
+        assert cache.stats()['entries'] == cache.max_entries
+        calls = []
+        cached_figure(df, lambda: calls.append(1) or px.histogram(df, x='value'),
+                      'histogram', 'plotly_white', nbins=0)
+        assert calls == [1]
+    
+    def test_figure_from_json_round_trip(self):
+        """Test that a stored figure is usable and can still be modified"""
+        fig = px.scatter(generate_scatter_data(n_points=200, seed=1), x='x', y='y', color='group')
+        restored = figure_from_json(fig.to_json())
+        restored.update_layout(height=123)
+        
+        assert len(restored.data) == 3
+        assert restored.layout.height == 123
+
+
+class TestStaticRendering:
+    """Test suite for the matplotlib/seaborn static render pipeline"""
+    
+    def setup_method(self):
+        get_static_render_cache().clear()
+    
+    def test_backend_is_headless(self):
+        """Test that matplotlib renders with Agg"""
+        import matplotlib
+        
+        assert matplotlib.get_backend().lower() == 'agg'
+    
+    def test_png_and_svg_bytes(self):
+        """Test that both formats render to the expected bytes"""
+        matrix = generate_heatmap_data(size=8, seed=1)
+        
+        assert render_correlation_image(matrix, fmt='png', size=(4, 3)).startswith(b'\x89PNG')
+        assert b'<svg' in render_correlation_image(matrix, fmt='svg', size=(4, 3))
+    
+    def test_no_figures_left_open(self):
+        """Test that rendering registers nothing with pyplot"""
+        import matplotlib.pyplot as plt
+        plt.close('all')
+        for size in (8, 40):
+            render_correlation_image(generate_heatmap_data(size=size, seed=1), size=(4, 3))
+        
+        assert plt.get_fignums() == []
+    
+    def test_cache_key(self):
+        """Test that images are reused per matrix, size, cmap, theme and format"""
+        matrix = generate_heatmap_data(size=8, seed=1)
+        first = cached_correlation_image(matrix, size=(4, 3))
+        
+        assert cached_correlation_image(matrix.copy(), size=(4, 3)) is first
+        assert cached_correlation_image(matrix, size=(4, 3), theme='dark') is not first
+        assert cached_correlation_image(matrix, size=(4, 3), cmap='viridis') is not first
+        assert cached_correlation_image(matrix, size=(5, 3)) is not first
+        assert get_static_render_cache().stats()['entries'] == 4
+    
+    def test_fingerprint_is_exact(self):
+        """Test that any changed value or label changes the fingerprint"""
+        matrix = generate_heatmap_data(size=300, seed=1)
+        changed = matrix.copy()
+        changed.iloc[299, 298] += 1e-6
+        
+        assert matrix_fingerprint(matrix) == matrix_fingerprint(matrix.copy())
+        assert matrix_fingerprint(changed) != matrix_fingerprint(matrix)
+        assert matrix_fingerprint(matrix.iloc[::-1, ::-1]) != matrix_fingerprint(matrix)
+    
+    def test_fingerprint_is_stable_across_processes(self):
+        """Test that the fingerprint does not depend on the string hash seed"""
+        script = ("import pandas as pd; from app import matrix_fingerprint; "
+                  "print(matrix_fingerprint(pd.DataFrame([[1.0]], index=['a'], columns=['b'])))")
+        outputs = {
+            subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                           check=True, env={**os.environ, 'PYTHONHASHSEED': seed}).stdout
+            for seed in ('1', '2')
+        }
+        
+        assert len(outputs) == 1
+    
+    def test_fast_path_for_large_matrices(self):
+        """Test that a large matrix renders quickly without seaborn's per-cell annotations"""
+        matrix = generate_heatmap_data(size=200, seed=1)
+        start = time.perf_counter()
+        image = render_correlation_image(matrix, size=(6, 5))
+        
+        assert image.startswith(b'\x89PNG')
+        assert time.perf_counter() - start < 5
+    
+    @pytest.mark.slow
+    def test_memory_flat_across_reruns(self):
+        """Soak test: 1,000 fresh renders leave no open figures and flat resident memory"""
+        import gc
+        import matplotlib.pyplot as plt
+        if not os.path.exists('/proc/self/statm'):
+            pytest.skip("resident memory is read from /proc")
+        
+        def resident_bytes():
+            gc.collect()
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        
+        matrix = generate_heatmap_data(size=6, seed=1)
+        cache = get_static_render_cache()
+        
+        def rerun(i):
+            cache.clear()  # every rerun renders, as after an eviction or in a new process
+            cached_correlation_image(matrix, size=(2, 2), theme=('light', 'dark')[i % 2])
+        
+        for i in range(50):  # warm up font, glyph and allocator caches
+            rerun(i)
+        baseline = resident_bytes()
+        for i in range(1000):
+            rerun(i)
+        growth = resident_bytes() - baseline
+        
+        assert plt.get_fignums() == []
+        assert cache.stats()['misses'] == 1
+        assert growth < 32 * 1024 * 1024
+
+
+class TestLazyPanels:
+    """Test suite for selector-driven lazy panels"""
+    
+    @staticmethod
+    def _panels_app():
+        import streamlit as st
+        from app import show_lazy_panels
+        
+        built = st.session_state.setdefault('built', [])
+        show_lazy_panels({name: (lambda name=name: built.append(name) or st.write(name))
+                          for name in ("One", "Two", "Three")}, key='view')
+    
+    def test_only_active_panel_runs(self):
+        """Test that only the selected panel is computed and rendered"""
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_function(self._panels_app).run()
+        
+        assert at.session_state.built == ["One"]
+        assert [element.value for element in at.markdown] == ["One"]
+    
+    def test_switching_runs_only_new_panel(self):
+        """Test that switching views builds the new view and nothing else"""
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_function(self._panels_app).run()
+        at.radio(key='view').set_value("Three").run()
+        
+        assert at.session_state.built == ["One", "Three"]
+        assert [element.value for element in at.markdown] == ["Three"]
+
+
+class TestDistributionStats:
+    """Test suite for server-side histogram, box and violin statistics"""
+    
+    def test_histogram_counts(self):
+        """Test that bin counts cover every finite sample"""
+        values = np.append(generate_distribution_data(5_000, seed=1)['normal'].to_numpy(), np.nan)
+        counts, edges = histogram_stats(values, bins=30)
+        
+        assert len(counts) == 30 and len(edges) == 31
+        assert counts.sum() == 5_000
+    
+    def test_box_stats_match_numpy(self):
+        """Test quartiles, whiskers and outliers against direct computation"""
+        values = generate_distribution_data(20_000, seed=2)['exponential'].to_numpy()
+        stats = box_stats(values, max_outliers=10)
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        upper = q3 + 1.5 * (q3 - q1)
+        
+        assert (stats['q1'], stats['median'], stats['q3']) == pytest.approx((q1, median, q3))
+        assert stats['upperfence'] == values[values <= upper].max()
+        assert stats['lowerfence'] == values.min()
+        assert len(stats['outliers']) == 10
+        assert stats['outliers'][-1] == values.max()
+    
+    def test_kde_matches_exact_density(self):
+        """Test the binned KDE against the exact Gaussian kernel sum"""
+        values = np.random.default_rng(0).normal(size=2_000)
+        grid, density = kde_stats(values, bandwidth=0.3)
+        exact = np.exp(-0.5 * ((grid[:, np.newaxis] - values) / 0.3) ** 2).sum(axis=1)
+        exact /= len(values) * 0.3 * np.sqrt(2 * np.pi)
+        
+        assert len(grid) == 200
+        assert np.abs(density - exact).max() < 1e-3
+        assert (density * (grid[1] - grid[0])).sum() == pytest.approx(1, abs=1e-3)
+    
+    def test_figures_carry_only_aggregates(self):
+        """Test that the payload stays flat as the sample count grows"""
+        columns = ['normal', 'exponential']
+        small = generate_distribution_data(1_000, seed=3)
+        large = generate_distribution_data(200_000, seed=3)
+        
+        for build in (lambda df: build_histogram_figure(df['normal'], 50),
+                      lambda df: build_box_figure(df, columns),
+                      lambda df: build_violin_figure(df, columns)):
+            assert len(build(large).to_json()) < 1.2 * len(build(small).to_json())
+            assert len(build(large).to_json()) < 50_000
+    
+    @pytest.mark.parametrize('values', [[], [np.nan, np.nan]])
+    def test_empty_input_gives_empty_stats(self, values):
+        """Test that empty or all-NaN input yields empty stats instead of raising"""
+        stats = box_stats(values)
+        grid, density = kde_stats(values)
+        
+        assert np.isnan(stats['median']) and len(stats['outliers']) == 0
+        assert len(grid) == len(density) == 0
+    
+    def test_empty_column_draws_empty_trace(self):
+        """Test that box and violin figures build with an all-NaN column"""
+        df = pd.DataFrame({'normal': np.arange(10.0), 'exponential': np.nan})
+        columns = ['normal', 'exponential']
+        
+        for fig in (build_box_figure(df, columns), build_violin_figure(df, columns)):
+            empty = [trace for trace in fig.data if trace.name == 'Exponential']
+            assert all(len(trace.x) == 0 for trace in empty)
+            fig.to_json()
+
+
+class TestIncrementalSamples:
+    """Test suite for prefix-stable sample buffers"""
+    
+    def setup_method(self):
+        get_dataset_cache().clear()
+        get_sample_buffer_cache().clear()
+    
+    def test_growing_matches_fresh_draw(self):
+        """Test that a grown sample equals one drawn at full size"""
+        small = generate_distribution_data(n_samples=1000, seed=5)
+        grown = generate_distribution_data(n_samples=1100, seed=5)
+        get_sample_buffer_cache().clear()
+        get_dataset_cache().clear()
+        fresh = generate_distribution_data(n_samples=1100, seed=5)
+        
+        pd.testing.assert_frame_equal(grown, fresh)
+        pd.testing.assert_frame_equal(grown.iloc[:1000], small)
+    
+    def test_growing_draws_only_the_delta(self):
+        """Test that the block function is asked for the missing rows only"""
+        sizes = []
+        
+        def block(rngs, size):
+            sizes.append(size)
+            return {'value': rngs[0].random(size)}
+        
+        buffer = sample_buffer('counted', 1, block, 1, 1000)
+        sample_buffer('counted', 1, block, 1, 1100)
+        sample_buffer('counted', 1, block, 1, 600)
+        
+        assert sizes == [1000, 100]
+        assert buffer.length == 1100
+    
+    def test_shrinking_is_a_view(self):
+        """Test that a smaller sample shares memory with the buffer"""
+        generate_scatter_data(n_points=2000, seed=3)
+        small = generate_scatter_data(n_points=500, seed=3)
+        buffer = get_sample_buffer_cache().get(('scatter', 3))
+        
+        assert np.shares_memory(small['x'].to_numpy(), buffer.column('x', 2000))
+        assert (small['group'].to_numpy() == SCATTER_GROUPS[buffer.column('codes', 500)]).all()
+    
+    def test_scatter_prefix_is_stable(self):
+        """Test that every scatter column is prefix-stable, lean or not"""
+        large = generate_scatter_data(n_points=3000, seed=8)
+        get_sample_buffer_cache().clear()
+        small = generate_scatter_data(n_points=1000, seed=8)
+        lean = generate_scatter_data(n_points=1000, seed=8, lean=True)
+        
+        pd.testing.assert_frame_equal(large.iloc[:1000], small)
+        assert list(lean['group'].astype(str)) == list(small['group'])
+    
+    def test_histogram_updates_match_numpy(self):
+        """Test incremental histograms against np.histogram while growing and shrinking"""
+        buffer = distribution_buffer(2, 1000)
+        
+        for n in (1000, 1100, 5000, 4000, 700, 20_000, 19_500):
+            counts, edges = buffer.histogram('exponential', n, bins=40)
+            expected, expected_edges = np.histogram(buffer.column('exponential', n), bins=40)
+            
+            np.testing.assert_array_equal(counts, expected)
+            np.testing.assert_array_equal(edges, expected_edges)
+    
+    def test_unseeded_buffers_are_not_cached(self):
+        """Test that seed=None draws a fresh buffer every call"""
+        block = lambda rngs, size: {'v': rngs[0].random(size)}
+        first = sample_buffer('uniform', None, block, 1, 10)
+        second = sample_buffer('uniform', None, block, 1, 10)
+        
+        assert len(get_sample_buffer_cache()) == 0
+        assert not np.array_equal(first.column('v', 10), second.column('v', 10))
+    
+    def test_cache_tracks_grown_size(self):
+        """Test that the buffer cache accounts for growth"""
+        distribution_buffer(4, 1000)
+        before = get_sample_buffer_cache().stats()['bytes']
+        distribution_buffer(4, 5000)
+        
+        buffer = get_sample_buffer_cache().get(('distribution', 4))
+        
+        assert get_sample_buffer_cache().stats()['bytes'] == buffer.nbytes > before
+    
+    def test_cached_views_count_their_base(self):
+        """Test that a cached prefix is charged for the buffer it pins"""
+        generate_distribution_data(n_samples=50_000, seed=6)
+        small = generate_distribution_data(n_samples=100, seed=6)
+        buffer = get_sample_buffer_cache().get(('distribution', 6))
+        
+        assert estimate_nbytes(small) >= buffer.nbytes
+        assert estimate_nbytes(small.copy()) < buffer.nbytes
+
+
+class TestLiveChart:
+    """Test suite for the live realtime chart"""
+    
+    def test_traces_match_stream_window(self):
+        """Test that per-category traces hold exactly the stream's window"""
+        stream = RealtimeStream(seed=2, capacity=100, start='2024-01-01')
+        stream.tick(100)
+        traces = LiveTraces(stream)
+        traces.sync()
+        stream.tick(37)
+        traces.sync()
+        frame = stream.frame(50)
+        
+        for code, (x, y) in enumerate(traces.windows(50)):
+            rows = frame[frame['category'].cat.codes == code]
+            np.testing.assert_array_equal(y, rows['value'].to_numpy())
+            np.testing.assert_array_equal(x, rows['timestamp'].to_numpy().view(np.int64) / 1e6)
+    
+    def test_sync_reads_only_new_samples(self):
+        """Test that a sync routes only the samples appended since the last one"""
+        stream = RealtimeStream(seed=1, capacity=1_000, start='2024-01-01')
+        stream.tick(1_000)
+        traces = LiveTraces(stream)
+        
+        assert traces.sync() == 1_000
+        stream.tick(5)
+        assert traces.sync() == 5
+        assert traces.sync() == 0
+        assert sum(buffer.total_appended for buffer in traces.buffers) == 1_005
+    
+    def test_windows_are_views(self):
+        """Test that trace arrays share memory with the category buffers"""
+        stream = RealtimeStream(seed=1, capacity=200, start='2024-01-01')
+        stream.tick(300)
+        traces = LiveTraces(stream)
+        traces.sync()
+        
+        x, y = traces.windows(100)[0]
+        assert np.shares_memory(y, traces.buffers[0].window()['y'])
+    
+    def test_live_figure_layout(self):
+        """Test trace types, date axis and preserved UI state of the live figure"""
+        windows = [(np.arange(3) * 6e4, np.arange(3.0))] * 3
+        line = build_live_figure(windows, 'Line', template='plotly_white')
+        scatter = build_live_figure([(np.arange(2_000.0), np.arange(2_000.0))] * 3, 'Scatter',
+                                    template='plotly_white')
+        
+        assert [trace.name for trace in line.data] == ['Sensor A', 'Sensor B', 'Sensor C']
+        assert line.layout.xaxis.type == 'date'
+        assert line.layout.uirevision == 'Line'
+        assert scatter.data[0].type == 'scattergl'
+    
+    def test_live_figure_respects_point_budget(self):
+        """Test that windows over the budget are downsampled per category"""
+        x = np.arange(3_000.0)
+        windows = [(x, np.sin(x)), (x[:1_500], np.cos(x[:1_500])), (x[:10], x[:10])]
+        fig = build_live_figure(windows, 'Line', budget=450)
+        sizes = [len(trace.x) for trace in fig.data]
+        
+        assert sum(sizes) <= 450 + 3  # every category keeps at least 3 points
+        assert sizes[0] > sizes[1] > 3 and sizes[2] == 3
+        assert fig.data[0].x[0] == 0 and fig.data[0].x[-1] == 2_999
+        assert sum(len(trace.x) for trace in build_live_figure(windows, 'Line').data) == 4_510
+    
+    @staticmethod
+    def _live_app():
+        import streamlit as st
+        from app import show_live_chart
+        
+        st.session_state.setdefault('data_seed', 1)
+        st.session_state.setdefault('dark_mode', False)
+        show_live_chart('Line', 50, 5, 100)
+    
+    def test_fragment_advances_stream(self):
+        """Test that each run of the live fragment ticks the stream and draws the chart"""
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_function(self._live_app).run()
+        total = at.session_state.realtime_stream.buffer.total_appended
+        at.run()
+        
+        assert at.session_state.realtime_stream.buffer.total_appended == total + 5
+        assert len(at.get('plotly_chart')) == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--cov=app", "--cov-report=term-missing"])
 